@@ -0,0 +1,207 @@
+"""
+Dashboard layout configuration (ui_config.json) and helpers shared by the render backends.
+"""
+from PySide6.QtCore import Qt
+from typing import NamedTuple
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+# --- Configuration Loading ---
+CONFIG_FILE_PATH = os.getenv("UI_CONFIG_FILE", "ui_config.json")
+# "low" trades a little fidelity for footprint on 512 MB devices: painter backend
+# only, a lightweight notes Markdown painter, one reused frame buffer and no raw
+# provider payloads kept once they are parsed
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "default")
+LOW_MEMORY = MEMORY_PROFILE == "low"
+DEFAULT_CONFIG = { # Fallback values if config.json is missing or incomplete
+    "global_settings": {
+        "timezone": "Europe/Amsterdam",
+        "font_family": "Bookerly, sans-serif",
+        "main_window_width": 800,
+        "main_window_height": 480,
+        "default_background_color": "white",
+        "default_text_color": "black"
+    },
+    "eink_calendar": {
+        "font_size": 12, "font_bold": True, "header_font_size": 13, "header_font_bold": True,
+        "background_color": "white", "text_color": "black", "grid_visible": False,
+        "vertical_header_format_none": True, "navigation_bar_visible": False,
+        "current_date_fill_color": "black", "current_date_text_color": "white",
+        "event_indicator_line_color": "black", "event_indicator_line_width": 2
+    },
+    "dashboard_elements": {
+        "weather_icon": {"font_size": 90, "font_bold": True, "geometry": [5, -50, 175, 160],
+                         "style": "atlas", "icon_geometry": [20, 10, 150, 150]},
+        "sun_info": {"font_size": 11, "font_bold": True, "alignment_h": "AlignLeft", "alignment_v": "AlignVCenter", "geometry": [10, 170, 240, 20]},
+        "clock_label": {"font_size": 85, "font_bold": True, "alignment_h": "AlignLeft", "alignment_v": "AlignVCenter", "geometry": [190, 1, 320, 160], "time_format": "HH:mm"},
+        "date_label": {"font_size": 14, "font_bold": True, "alignment_h": "AlignCenter", "alignment_v": "AlignVCenter", "geometry": [250, 135, 220, 30], "date_format": "dddd dd/MM"},
+        "home_status": {"font_size": 10, "font_bold": True, "alignment_h": "AlignCenter", "alignment_v": "AlignVCenter", "geometry": [280, 176, 200, 18]},
+        "chart_view": {
+            "geometry": [-20, 195, 500, 285], "antialiasing": False, "forecast_icons": {"size": 28, "spacing": 4},
+            "high_series_pen": {"color": "black", "width": 4, "style": "SolidLine"},
+            "low_series_pen": {"color": "black", "width": 2, "style": "DashLine"},
+            "axisX": {"format": "ddd", "tick_count": 5, "grid_line_visible": False, "labels_font_size": 12, "labels_font_bold": True},
+            "axisY": {"range_min": -10, "range_max": 40, "label_format": "%d°C", "grid_line_visible": False, "labels_font_size": 12, "labels_font_bold": True}
+        },
+        "calendar_widget_instance": {"geometry": [450, 205, 350, 280]},
+        "notes_text_edit": {"font_size": 10, "font_bold": False, "geometry": [550, 5, 240, 190], "vertical_scrollbar_policy": "ScrollBarAlwaysOff", "horizontal_scrollbar_policy": "ScrollBarAlwaysOff", "frame_shape": "NoFrame"},
+        "sysinfo_label": {"font_size": 8, "font_bold": False, "geometry": [10, 460, 400, 20]}
+    },
+    # MQTT sensor widgets, see providers/sensor_provider.py for the keys
+    "sensors": [],
+    # Frames written per render, see get_outputs(); empty = one frame of the layout size
+    "outputs": []
+}
+
+def load_config():
+    """Loads configuration from JSON file."""
+    try:
+        with open(CONFIG_FILE_PATH, 'r') as f:
+            config_from_file = json.load(f)
+        # Basic merge with defaults to ensure all keys are present
+        # More sophisticated merging might be needed for deeply nested structures if partial configs are expected
+        merged_config = DEFAULT_CONFIG.copy()
+        for key, value in config_from_file.items():
+            if isinstance(value, dict) and key in merged_config:
+                merged_config[key].update(value)
+            else:
+                merged_config[key] = value
+        return merged_config
+    except FileNotFoundError:
+        log.warning("Configuration file '%s' not found. Using default settings.", CONFIG_FILE_PATH)
+        return DEFAULT_CONFIG
+    except json.JSONDecodeError:
+        log.error("Could not decode '%s'. Using default settings.", CONFIG_FILE_PATH)
+        return DEFAULT_CONFIG
+
+APP_CONFIG = load_config()
+
+# Helper to get config values safely
+def get_config_value(path, default=None):
+    """
+    Retrieves a value from the APP_CONFIG dictionary using a path.
+    Example: get_config_value(['dashboard_elements', 'clock_label', 'font_size'], 85)
+    """
+    current = APP_CONFIG
+    for key in path:
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+        else:
+            # print(f"Warning: Config path '{'/'.join(path)}' not found. Using default: {default}")
+            return default
+    return current
+
+# Helper to map string names to Qt.AlignmentFlag values
+def get_qt_alignment(h_align_str, v_align_str):
+    """Converts string alignment to Qt.AlignmentFlag."""
+    alignment = Qt.AlignmentFlag(0)
+    h_map = {
+        "AlignLeft": Qt.AlignLeft, "AlignRight": Qt.AlignRight, "AlignHCenter": Qt.AlignHCenter,
+        "AlignJustify": Qt.AlignJustify, "AlignCenter": Qt.AlignCenter # AlignCenter is generic
+    }
+    v_map = {
+        "AlignTop": Qt.AlignTop, "AlignBottom": Qt.AlignBottom, "AlignVCenter": Qt.AlignVCenter,
+        "AlignCenter": Qt.AlignCenter # AlignCenter is generic
+    }
+    if h_align_str in h_map:
+        alignment |= h_map[h_align_str]
+    if v_align_str in v_map:
+        alignment |= v_map[v_align_str]
+    
+    # If only one AlignCenter is provided, apply it to both if the other is not specified
+    if h_align_str == "AlignCenter" and not v_align_str and not (alignment & Qt.AlignVCenter):
+        alignment |= Qt.AlignVCenter
+    if v_align_str == "AlignCenter" and not h_align_str and not (alignment & Qt.AlignHCenter):
+        alignment |= Qt.AlignHCenter
+
+    if alignment == Qt.AlignmentFlag(0): # if no valid flags found
+        return Qt.AlignLeft | Qt.AlignVCenter # Default
+    return alignment
+
+
+# Helper to map string names to Qt.PenStyle values
+def get_qt_pen_style(style_str):
+    """Converts string pen style to Qt.PenStyle."""
+    style_map = {
+        "SolidLine": Qt.SolidLine, "DashLine": Qt.DashLine, "DotLine": Qt.DotLine,
+        "DashDotLine": Qt.DashDotLine, "DashDotDotLine": Qt.DashDotDotLine, "NoPen": Qt.NoPen
+    }
+    return style_map.get(style_str, Qt.SolidLine)
+
+
+# --- Layout geometry ---
+# A "geometry" is either [x, y, w, h] in layout pixels (the main_window size), or
+# an object {"anchor": "bottom-right", "x": 10, "y": 10, "w": "30%", "h": 120}:
+# numbers are layout pixels, "N%" strings are shares of the canvas, and x/y are
+# offsets from the anchored edge (top/bottom, left/right or center).
+ANCHOR_FACTORS = {"left": 0.0, "top": 0.0, "right": 1.0, "bottom": 1.0}
+
+
+def _length(value, extent):
+    if isinstance(value, str) and value.endswith('%'):
+        return float(value[:-1]) * extent / 100
+    return float(value)
+
+
+def resolve_geometry(geometry, canvas):
+    """[x, y, w, h] of a geometry on a canvas of (width, height) layout pixels."""
+    if not isinstance(geometry, dict):
+        return list(geometry)
+    width, height = canvas
+    w, h = _length(geometry.get('w', '100%'), width), _length(geometry.get('h', '100%'), height)
+    x, y = _length(geometry.get('x', 0), width), _length(geometry.get('y', 0), height)
+
+    anchor = geometry.get('anchor', 'top-left').split('-')
+    # "top", "left", "center", ...: the axis not named is centered
+    fx = next((ANCHOR_FACTORS[a] for a in anchor if a in ("left", "right")), 0.5)
+    fy = next((ANCHOR_FACTORS[a] for a in anchor if a in ("top", "bottom")), 0.5)
+    # an offset moves away from the anchored edge, and from the middle towards right/bottom
+    sx = -1 if fx == 1.0 else 1
+    sy = -1 if fy == 1.0 else 1
+    return [(width - w) * fx + sx * x, (height - h) * fy + sy * y, w, h]
+
+
+class OutputTarget(NamedTuple):
+    """One frame written per render: panel resolution, clockwise rotation and file."""
+    file: str
+    width: int
+    height: int
+    rotation: int = 0
+
+    @property
+    def image_size(self):
+        """Size of the written image; 90/270 degree panels get it transposed."""
+        if self.rotation % 180:
+            return self.height, self.width
+        return self.width, self.height
+
+
+def get_layout_size():
+    global_cfg = get_config_value(['global_settings'], {})
+    return global_cfg.get('main_window_width', 800), global_cfg.get('main_window_height', 480)
+
+
+def get_outputs(default_file):
+    """
+    The "outputs" list of the config, e.g.
+    [{"file": "panel-1448.png", "width": 1448, "height": 1072, "rotation": 90}];
+    without one, a single frame of the layout size is written to `default_file`.
+    """
+    outputs = get_config_value(['outputs']) or [{}]
+    width, height = get_layout_size()
+    return [OutputTarget(o.get('file', default_file), o.get('width', width), o.get('height', height),
+                         o.get('rotation', 0) % 360)
+            for o in outputs]
+
+
+GLOBAL_CFG = get_config_value(['global_settings'])
+TIMEZONE_STR = GLOBAL_CFG.get('timezone', 'Europe/Amsterdam')
+
+
+def get_font_families():
+    """Splits the CSS-like global font_family list ("Bookerly, sans-serif") into family names."""
+    family = get_config_value(['global_settings', 'font_family'], "Bookerly, sans-serif")
+    return [name.strip().strip('"\'') for name in family.split(',') if name.strip()]
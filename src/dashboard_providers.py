@@ -0,0 +1,166 @@
+"""
+The data providers shared by every frame, and the dummy that stands in for any
+of them. Kept apart from the widget code so the painter backend can run
+without importing QtWidgets.
+"""
+import logging
+import os
+import time
+
+from dashboard_config import get_config_value, TIMEZONE_STR, LOW_MEMORY
+from providers.agenda_index import AgendaIndex
+from providers.weather_state import WeatherState
+from metrics import REGISTRY
+from resilience import CircuitBreaker, FrameBudget, GuardedProvider, LastGoodCache
+
+log = logging.getLogger(__name__)
+
+PROVIDERS_WAITING_TIME = int(os.getenv("PROVIDERS_WAITING_TIME", "5")) # Default to 5s
+# Seconds a provider read may take before the last good result is shown instead;
+# the events read can include a Calendar API refresh, so it gets longer
+PROVIDER_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", "2"))
+EVENTS_TIMEOUT_SECONDS = float(os.getenv("EVENTS_TIMEOUT_SECONDS", "30"))
+# Consecutive failures that open a provider's circuit, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "300"))
+# Last good provider results, shown (marked stale) while a provider is down; "" keeps them in memory only
+LAST_GOOD_CACHE_FILE = os.getenv("LAST_GOOD_CACHE_FILE", "last_good_cache.json")
+
+PROVIDER_STALE_SECONDS = REGISTRY.gauge(
+    "dashboard_provider_stale_seconds", "Age of the stale data a provider served in the last frame; "
+    "0 when live, +Inf when it never had data", ["provider"])
+
+# Dummy provider used when the real ones are not available, and as the base
+# for the fake providers of the test harness (test/test_golden.py)
+class DummyProvider:
+    def __init__(self, *args, **kwargs): pass
+    def start(self): pass
+    def get_weather_state(self): return WeatherState()
+    def get_weather_icon(self): return "❓"
+    def get_weather_code(self): return None
+    def get_daily_codes(self): return ()
+    def get_current_temperature(self): return "N/A°C"
+    def get_sun_times(self): return ("N/A", "N/A")
+    def get_status(self): return "Home status: N/A"
+    def get_info(self, now=None): return "System info: N/A"
+    def get_events(self, now=None): return []
+    def get_notes_markdown(self, now=None): return "# Notes\nN/A"
+    def get_highs_and_lows(self): return ([0]*5, [0]*5)
+    def get_agenda(self, now=None): return AgendaIndex([])
+    def get_readings(self, now=None): return []
+    @staticmethod
+    def extract_all_dates(events): return []
+
+# Data Providers (assuming these are in a 'providers' subdirectory)
+# Make sure these provider files exist or adjust imports as needed.
+# For demonstration, I'll assume they exist and have the necessary methods.
+try:
+    from providers.weather_provider import WeatherProvider
+    from providers.events_provider import EventsProvider
+    from providers.home_status_provider import HomeStatusProvider
+    from providers.notes_provider import NotesProvider
+    from providers.system_info_provider import SystemInfoProvider
+    from providers.sensor_provider import SensorProvider
+except ImportError:
+    log.warning("Could not import one or more provider modules. Using dummy providers.")
+    WeatherProvider = DummyProvider
+    EventsProvider = DummyProvider
+    HomeStatusProvider = DummyProvider
+    NotesProvider = DummyProvider
+    SystemInfoProvider = DummyProvider
+    SensorProvider = DummyProvider
+
+
+def _as_tuple(value):
+    return tuple(value)
+
+
+def _as_tuples(value):
+    return tuple(tuple(v) for v in value)
+
+
+# Guarded reads per provider: {method: (encode, decode) or None}, see resilience.GuardedProvider
+GUARDED_METHODS = {
+    "weather": {
+        "get_weather_state": (WeatherState.to_list, WeatherState.from_list),
+        "get_weather_icon": None,
+        "get_weather_code": None,
+        "get_daily_codes": (list, _as_tuple),
+        "get_current_temperature": None,
+        "get_sun_times": (list, _as_tuple),
+        "get_highs_and_lows": (lambda v: [list(v[0]), list(v[1])], _as_tuples),
+    },
+    "home_status": {"get_status": None},
+    "events": {"get_agenda": (lambda agenda: agenda.to_rows(), lambda rows: AgendaIndex.from_rows(rows, TIMEZONE_STR))},
+    "notes": {"get_notes_markdown": None},
+}
+
+
+class DashboardProviders:
+    """
+    The data providers, created once and shared by every rendered frame.
+    Any of them can be passed in to replace the default one (e.g. fakes in tests).
+
+    The weather, home status, events and notes providers are wrapped in
+    GuardedProviders: a read that fails, or doesn't answer within its timeout
+    and the frame's time budget, shows the last good result and stale()
+    reports since when.
+    """
+    def __init__(self, weather_provider=None, home_status_provider=None, system_info_provider=None,
+                 event_list_provider=None, notes_provider=None, sensor_provider=None, cache=None):
+        self.cache = cache if cache is not None else LastGoodCache(LAST_GOOD_CACHE_FILE)
+        self.weather_provider = self._guard("weather", weather_provider or WeatherProvider())
+        self.home_status_provider = self._guard("home_status", home_status_provider or HomeStatusProvider())
+        self.system_info_provider = system_info_provider or SystemInfoProvider()
+        # the low memory profile keeps only the parsed agenda, not the raw API payload
+        self.event_list_provider = self._guard(
+            "events", event_list_provider or EventsProvider(TIMEZONE_STR, keep_raw_events=not LOW_MEMORY),
+            timeout=EVENTS_TIMEOUT_SECONDS, uncached=("refresh",))
+        self.notes_provider = self._guard("notes", notes_provider or NotesProvider(self.event_list_provider)) # Assuming NotesProvider might use EventListProvider
+        self.sensor_provider = sensor_provider or SensorProvider(get_config_value(['sensors'], []))
+
+    def _guard(self, name, provider, timeout=PROVIDER_TIMEOUT_SECONDS, uncached=()):
+        return GuardedProvider(provider, name, GUARDED_METHODS[name], self.cache, timeout=timeout,
+                               breaker=CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS),
+                               fallback=DummyProvider(), uncached=uncached)
+
+    def _guards(self):
+        return {provider.name: provider
+                for provider in (self.weather_provider, self.home_status_provider,
+                                 self.event_list_provider, self.notes_provider)}
+
+    def begin_frame(self, seconds):
+        """Caps the provider reads of the next frame to `seconds` in total."""
+        budget = FrameBudget(seconds)
+        for guard in self._guards().values():
+            guard.budget = budget
+
+    def end_frame(self):
+        """Lifts the frame budget, so calls between frames (e.g. the events refresh) get their own timeouts."""
+        for guard in self._guards().values():
+            guard.budget = None
+
+    def stale(self):
+        """
+        {provider name: unix time its data is stale since} for the providers that
+        served stale data in the last reads; 0 when there was no good data at all.
+        """
+        guards = self._guards()
+        stale = {name: guard.stale_since() for name, guard in guards.items()}
+        # the notes are built from the agenda, so they are as stale as it is
+        if stale["events"] is not None and (stale["notes"] is None or stale["events"] < stale["notes"]):
+            stale["notes"] = stale["events"]
+        now = time.time()
+        for name, since in stale.items():
+            PROVIDER_STALE_SECONDS.labels(name).set(0 if since is None else now - since if since else float("inf"))
+        return {name: since for name, since in stale.items() if since is not None}
+
+    def save_last_good(self):
+        """Writes the last good results to LAST_GOOD_CACHE_FILE when they changed."""
+        self.cache.flush()
+
+    def start(self):
+        """Starts the push (MQTT) providers; they update in the background."""
+        self.weather_provider.start()
+        self.home_status_provider.start()
+        self.sensor_provider.start()
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import os
+
+from PySide6.QtCore import QDate, QDateTime, QTimeZone
+
+# ISO timestamp that freezes the frame clock, e.g. "2025-05-19T08:30:00+02:00".
+# Naive values are taken in the configured timezone.
+FAKE_NOW = os.getenv("FAKE_NOW")
+
+
+@lru_cache(maxsize=None)
+def get_zoneinfo(timezone_name):
+    return ZoneInfo(timezone_name)
+
+
+@lru_cache(maxsize=None)
+def get_qt_timezone(timezone_name):
+    return QTimeZone(timezone_name.encode())
+
+
+class FrameClock:
+    """
+    The time of one rendered frame, captured once in the configured timezone.
+    Every widget and provider reads from the same instance so a frame never
+    mixes two instants or two timezones.
+    """
+    def __init__(self, timezone_name, now=None):
+        self.timezone_name = timezone_name
+        self.tz = get_zoneinfo(timezone_name)
+        self.qt_timezone = get_qt_timezone(timezone_name)
+
+        if now is None:
+            now = datetime.now(self.tz)
+        elif now.tzinfo is None:
+            now = now.replace(tzinfo=self.tz)
+        self.now = now.astimezone(self.tz)
+        self.utc_now = self.now.astimezone(timezone.utc)
+        self.today = self.now.date()
+
+        self.qt_now = QDateTime.fromMSecsSinceEpoch(int(self.now.timestamp() * 1000), self.qt_timezone)
+        self.qt_today = QDate(self.today.year, self.today.month, self.today.day)
+
+    @classmethod
+    def capture(cls, timezone_name, fake_now=FAKE_NOW):
+        """
+        Capture the clock for a new frame, honouring FAKE_NOW when it is set.
+        """
+        if fake_now:
+            return cls(timezone_name, datetime.fromisoformat(fake_now))
+        return cls(timezone_name)
@@ -0,0 +1,178 @@
+"""
+Output stage: colour reduction, encoding and an atomic write of each frame,
+run on a worker thread so the render thread is free as soon as the frame is painted.
+"""
+from PySide6.QtGui import QColor, QImage, QImageWriter
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import math
+import os
+import tempfile
+import time
+
+from metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+RENDER_PHASE_SECONDS = REGISTRY.histogram(
+    "dashboard_render_phase_seconds", "Duration of each frame phase: providers, paint (painter backend), build, "
+    "paint (widgets backend), convert, encode and write (per output)", ["phase"])
+OUTPUT_BYTES = REGISTRY.gauge("dashboard_output_bytes", "Size of the last frame written per output file", ["file"])
+FRAMES_WRITTEN = REGISTRY.counter("dashboard_frames_written_total", "Frames written per outcome (ok, failed)",
+                                  ["outcome"])
+
+
+def parse_gray_levels(value):
+    """Gray levels of the palette mode: 2 (black and white) to 256 (every 8-bit gray)."""
+    levels = int(value)
+    if not 2 <= levels <= 256:
+        raise ValueError(f"OUTPUT_GRAY_LEVELS must be between 2 and 256, got {levels}")
+    return levels
+
+
+# png, webp (lossless), qoi, raw (the converted pixel buffer as-is) or any
+# other format QImageWriter supports; defaults to the OUTPUT_FILE_NAME suffix
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "")
+# argb (unchanged), grayscale, palette (OUTPUT_GRAY_LEVELS grays) or mono (1 bit)
+OUTPUT_COLOR_MODE = os.getenv("OUTPUT_COLOR_MODE", "argb")
+# checked at startup, rather than failing every frame's write
+OUTPUT_GRAY_LEVELS = parse_gray_levels(os.getenv("OUTPUT_GRAY_LEVELS", "16"))
+# zlib level for PNG, 0 (fastest) to 9 (smallest); -1 keeps Qt's default
+OUTPUT_COMPRESSION_LEVEL = int(os.getenv("OUTPUT_COMPRESSION_LEVEL", "-1"))
+
+
+def load_qoi():
+    """
+    (numpy, qoi) when the optional QOI encoder is installed (pip install qoi),
+    else None. Imported on first use only, so processes that never write QOI
+    don't pay for numpy.
+    """
+    try:
+        import numpy
+        import qoi
+    except ImportError:
+        return None
+    return numpy, qoi
+
+
+def convert_color_mode(image, mode, gray_levels=OUTPUT_GRAY_LEVELS):
+    """Reduces a rendered frame to the colour depth the panel can show."""
+    if mode == "grayscale":
+        return image.convertToFormat(QImage.Format_Grayscale8)
+    if mode == "palette":
+        step = 255 / (gray_levels - 1)
+        palette = [QColor(round(i * step), round(i * step), round(i * step)).rgb() for i in range(gray_levels)]
+        return image.convertToFormat(QImage.Format_Indexed8, palette, Qt.ThresholdDither)
+    if mode == "mono":
+        return image.convertToFormat(QImage.Format_Mono, Qt.ThresholdDither)
+    return image
+
+
+def png_quality(compression_level):
+    """Maps a zlib level to the quality value Qt's PNG writer expects."""
+    if compression_level < 0:
+        return -1
+    # Qt derives the level as (100 - quality) * 9 / 91, rounding down
+    return 100 - math.ceil(min(compression_level, 9) * 91 / 9)
+
+
+def encode_image(image, fmt, compression_level=OUTPUT_COMPRESSION_LEVEL):
+    """Encodes a QImage to bytes in `fmt`."""
+    if fmt == "raw":
+        return bytes(image.constBits())
+    if fmt == "qoi":
+        modules = load_qoi()
+        if modules is None:
+            raise RuntimeError("QOI output needs the optional 'qoi' package")
+        numpy, qoi = modules
+        rgba = image.convertToFormat(QImage.Format_RGBA8888)
+        pixels = numpy.frombuffer(rgba.constBits(), numpy.uint8).reshape(
+            rgba.height(), rgba.bytesPerLine() // 4, 4)[:, :rgba.width()]
+        return qoi.encode(numpy.ascontiguousarray(pixels))
+
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    writer = QImageWriter(buffer, fmt.encode())
+    if fmt == "webp":
+        writer.setQuality(100) # 100 selects lossless WebP
+    elif fmt == "png":
+        writer.setQuality(png_quality(compression_level))
+    if not writer.write(image):
+        raise RuntimeError(f"{fmt} encoding failed: {writer.errorString()}")
+    buffer.close()
+    return data.data()
+
+
+def write_atomically(path, data):
+    """Writes to a temporary file next to `path` and renames it over `path`,
+    so a panel fetching the file never sees a half-written frame."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".frame-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class FrameWriter:
+    """
+    Converts, encodes and atomically writes frames on a single worker thread,
+    keeping per-format encode timings.
+    """
+    def __init__(self, fmt=OUTPUT_FORMAT, color_mode=OUTPUT_COLOR_MODE, compression_level=OUTPUT_COMPRESSION_LEVEL):
+        self.fmt = fmt.lower()
+        self.color_mode = color_mode
+        self.compression_level = compression_level
+        self.timings = {} # format -> list of encode seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-writer")
+
+    def output_format(self, output_file):
+        fmt = self.fmt or os.path.splitext(output_file)[1].lstrip(".").lower() or "png"
+        if fmt == "qoi" and load_qoi() is None:
+            log.warning("'qoi' package not installed, writing PNG instead")
+            return "png"
+        return fmt
+
+    def submit(self, image, output_file):
+        """Queues a frame; the returned future resolves to True once it is on disk."""
+        return self._executor.submit(self._write, image, output_file)
+
+    def submit_frames(self, frames):
+        """Queues (image, output_file) pairs; the future resolves to True once all are on disk."""
+        return self._executor.submit(lambda: all([self._write(image, output_file) for image, output_file in frames]))
+
+    def _write(self, image, output_file):
+        fmt = self.output_format(output_file)
+        try:
+            t0 = time.perf_counter()
+            converted = convert_color_mode(image, self.color_mode)
+            t1 = time.perf_counter()
+            data = encode_image(converted, fmt, self.compression_level)
+            t2 = time.perf_counter()
+            write_atomically(output_file, data)
+            t3 = time.perf_counter()
+        except Exception as e:
+            log.error("Failed to save dashboard to %s: %s", output_file, e)
+            FRAMES_WRITTEN.labels("failed").inc()
+            return False
+
+        RENDER_PHASE_SECONDS.labels("convert").observe(t1 - t0)
+        RENDER_PHASE_SECONDS.labels("encode").observe(t2 - t1)
+        RENDER_PHASE_SECONDS.labels("write").observe(t3 - t2)
+        OUTPUT_BYTES.labels(output_file).set(len(data))
+        FRAMES_WRITTEN.labels("ok").inc()
+
+        self.timings.setdefault(fmt, []).append(t2 - t1)
+        log.info("Dashboard saved to %s (%s/%s, %d bytes; convert %.1f ms, encode %.1f ms, write %.1f ms)",
+                 output_file, fmt, self.color_mode, len(data), (t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000)
+        return True
+
+    def close(self):
+        """Waits for queued frames to be written."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,82 @@
+"""
+Resident memory accounting for small devices: current and peak RSS, and a
+budget checked after every frame (RSS_BUDGET_MB).
+"""
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import resource
+import sys
+
+from metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+RSS_MB = REGISTRY.gauge("dashboard_rss_megabytes", "Resident set size after the last frame")
+PEAK_RSS_MB = REGISTRY.gauge("dashboard_peak_rss_megabytes", "Largest resident set size so far")
+MEMORY_RELEASES = REGISTRY.counter("dashboard_memory_releases_total", "Times memory was released to get under budget")
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    _malloc_trim = _libc.malloc_trim # glibc only
+except (OSError, AttributeError, TypeError):
+    _malloc_trim = None
+
+
+def peak_rss_mb():
+    """Largest resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    """Resident set size right now; falls back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def release_memory():
+    """Collects garbage and hands freed heap pages back to the OS."""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+class RssBudgetExceeded(RuntimeError):
+    pass
+
+
+class RssBudget:
+    """
+    Checked after each frame. Over budget, memory is released first; if the
+    process is still over, RssBudgetExceeded is raised so it exits and the
+    supervisor (cron, Docker restart policy) starts a fresh one.
+    A `limit_mb` of 0 only reports.
+    """
+    def __init__(self, limit_mb=0.0, rss_fn=current_rss_mb, release_fn=release_memory):
+        self.limit_mb = limit_mb
+        self.rss_fn = rss_fn
+        self.release_fn = release_fn
+        self.releases = 0
+
+    def check(self, label="frame"):
+        rss = self.rss_fn()
+        if self.limit_mb and rss > self.limit_mb:
+            self.release_fn()
+            self.releases += 1
+            MEMORY_RELEASES.inc()
+            rss = self.rss_fn()
+        RSS_MB.set(rss)
+        PEAK_RSS_MB.set(peak_rss_mb())
+        budget = f", budget {self.limit_mb:.0f} MB" if self.limit_mb else ""
+        log.info("Memory after %s: RSS %.1f MB, peak %.1f MB%s", label, rss, peak_rss_mb(), budget)
+        if self.limit_mb and rss > self.limit_mb:
+            raise RssBudgetExceeded(f"RSS {rss:.1f} MB is over the {self.limit_mb:.0f} MB budget")
+        return rss
@@ -0,0 +1,641 @@
+"""
+Widget-free render backend: paints the `dashboard_elements` layout straight onto a
+QImage with QPainter. Only QtGui is needed (a QGuiApplication on the offscreen
+platform), so no QWidget tree, style sheets, QtCharts or show()/processEvents().
+The output is laid out to match the widget backend (widget_backend.py).
+
+Provider data is read once per frame; each output target (resolution and
+rotation) is then a vector paint pass over the same data, scaled by the painter
+transform rather than resampled.
+"""
+from PySide6.QtGui import (QAbstractTextDocumentLayout, QColor, QFont, QFontMetricsF, QImage, QPainter,
+                           QPainterPath, QPalette, QPen, QTextDocument)
+from PySide6.QtCore import QLocale, QPointF, QRectF, Qt
+from datetime import datetime
+from typing import NamedTuple
+
+from dashboard_config import (OutputTarget, get_config_value, get_font_families, get_layout_size, get_qt_alignment,
+                              get_qt_pen_style, resolve_geometry)
+from providers.weather_codes import conditions
+from weather_icons import get_atlas
+
+# QtCharts light theme values, so charts look like the QChartView ones
+CHART_MARGIN = 20
+CHART_AXIS_LINE_COLOR = "#d6d6d6"
+CHART_LABEL_COLOR = "#404044"
+CHART_Y_LABEL_SPACING = 17
+CHART_X_LABEL_SPACING = 16
+CHART_RIGHT_PADDING = 29
+
+# QCalendarWidget defaults
+CALENDAR_HEADER_BACKGROUND = "#f7f7f7"
+CALENDAR_WEEKEND_COLOR = "#ff0000"
+CALENDAR_ROWS = 7 # header + 6 weeks
+CALENDAR_COLUMNS = 7
+
+# QTextEdit default document margin
+NOTES_DOCUMENT_MARGIN = 4
+
+# Lightweight Markdown painter (low memory profile)
+MARKDOWN_HEADING_SCALE = {1: 1.8, 2: 1.5, 3: 1.25}
+MARKDOWN_BULLET = "•"
+
+SENSOR_DEFAULT_SHOW = ("value", "trend")
+SENSOR_SPARKLINE_WIDTH = 1.5
+
+# Element that carries the "stale since" badge of each guarded provider (see dashboard_providers.py)
+STALE_BADGE_ELEMENTS = {
+    "weather": "chart_view",
+    "home_status": "home_status",
+    "events": "calendar_widget_instance",
+    "notes": "notes_text_edit",
+}
+# Per-day icons under the weather chart ("forecast_icons" of chart_view)
+FORECAST_ICON_SIZE = 28
+FORECAST_ICON_SPACING = 4
+
+STALE_BADGE_FONT_SIZE = 7
+STALE_BADGE_PADDING = 2
+
+
+def make_font(point_size, bold):
+    font = QFont()
+    font.setFamilies(get_font_families())
+    font.setPointSize(point_size)
+    font.setBold(bold)
+    return font
+
+
+def element_rect(cfg, default, canvas):
+    return QRectF(*resolve_geometry(cfg.get('geometry', default), canvas))
+
+
+def apply_output_transform(painter, output, layout_size, letterbox=False):
+    """
+    Rotates and scales `painter` so the layout fills `output`; returns the canvas
+    size in layout pixels that relative geometry resolves against. The scale is
+    uniform: the canvas grows along the axis the panel is relatively longer in,
+    or with `letterbox` the layout is centered with borders instead.
+    """
+    out_w, out_h = output.image_size
+    if output.rotation == 90:
+        painter.translate(out_w, 0)
+    elif output.rotation == 180:
+        painter.translate(out_w, out_h)
+    elif output.rotation == 270:
+        painter.translate(0, out_h)
+    painter.rotate(output.rotation)
+
+    layout_w, layout_h = layout_size
+    scale = min(output.width / layout_w, output.height / layout_h)
+    if letterbox:
+        painter.translate((output.width - layout_w * scale) / 2, (output.height - layout_h * scale) / 2)
+        canvas = layout_size
+    else:
+        canvas = (output.width / scale, output.height / scale)
+    painter.scale(scale, scale)
+    return canvas
+
+
+def spline_control_points(points):
+    """
+    Bezier control points of the natural cubic spline through `points`,
+    the same curve QSplineSeries draws. Returns (first, second) lists with one
+    control point per segment.
+    """
+    n = len(points) - 1
+    if n < 1:
+        return [], []
+    if n == 1:
+        p0, p1 = points
+        first = QPointF((2 * p0.x() + p1.x()) / 3, (2 * p0.y() + p1.y()) / 3)
+        return [first], [QPointF(2 * first.x() - p0.x(), 2 * first.y() - p0.y())]
+
+    def solve(rhs):
+        # tridiagonal system [2 1; 1 4 1; ...; 1 3.5] solved by forward/back substitution
+        x = [0.0] * n
+        tmp = [0.0] * n
+        b = 2.0
+        x[0] = rhs[0] / b
+        for i in range(1, n):
+            tmp[i] = 1 / b
+            b = (4.0 if i < n - 1 else 3.5) - tmp[i]
+            x[i] = (rhs[i] - x[i - 1]) / b
+        for i in range(1, n):
+            x[n - i - 1] -= tmp[n - i] * x[n - i]
+        return x
+
+    rhs_x = [points[0].x() + 2 * points[1].x()]
+    rhs_y = [points[0].y() + 2 * points[1].y()]
+    for i in range(1, n - 1):
+        rhs_x.append(4 * points[i].x() + 2 * points[i + 1].x())
+        rhs_y.append(4 * points[i].y() + 2 * points[i + 1].y())
+    rhs_x.append((8 * points[n - 1].x() + points[n].x()) / 2.0)
+    rhs_y.append((8 * points[n - 1].y() + points[n].y()) / 2.0)
+
+    xs, ys = solve(rhs_x), solve(rhs_y)
+    first = [QPointF(xs[i], ys[i]) for i in range(n)]
+    second = []
+    for i in range(n):
+        if i < n - 1:
+            second.append(QPointF(2 * points[i + 1].x() - xs[i + 1], 2 * points[i + 1].y() - ys[i + 1]))
+        else:
+            second.append(QPointF((points[n].x() + xs[n - 1]) / 2, (points[n].y() + ys[n - 1]) / 2))
+    return first, second
+
+
+def allocate_frame(output=None):
+    """A frame sized for `output` (default: the layout size), for PainterDashboard to reuse."""
+    size = output.image_size if output is not None else get_layout_size()
+    return QImage(*size, QImage.Format_RGB32)
+
+
+def _markdown_runs(text):
+    """Splits inline Markdown into (word, bold) runs; only **bold** is understood."""
+    runs = []
+    for i, part in enumerate(text.split("**")):
+        runs.extend((word, i % 2 == 1) for word in part.split())
+    return runs
+
+
+def paint_markdown_lite(painter, rect, markdown, font, color):
+    """
+    Paints the Markdown subset the notes use (#-headings, "-"/"*" list items,
+    **bold** and blank-line paragraphs) with word wrapping, without building a
+    QTextDocument. Returns the height used.
+    """
+    bold_font = QFont(font)
+    bold_font.setBold(True)
+    painter.save()
+    painter.setClipRect(rect)
+    painter.setPen(QColor(color))
+    y = rect.top()
+    paragraph_gap = QFontMetricsF(font).height() / 2
+    for raw in markdown.splitlines():
+        line = raw.strip()
+        if not line:
+            y += paragraph_gap
+            continue
+        level = len(line) - len(line.lstrip('#'))
+        indent = 0.0
+        regular, bold = font, bold_font
+        if level and line[level:level + 1] == ' ':
+            scale = MARKDOWN_HEADING_SCALE.get(level, 1.0)
+            regular = QFont(bold_font)
+            regular.setPointSizeF(font.pointSizeF() * scale)
+            bold = regular
+            line = line[level:].strip()
+        elif line[:2] in ("- ", "* "):
+            painter.setFont(font)
+            fm = QFontMetricsF(font)
+            painter.drawText(QPointF(rect.left(), y + fm.ascent()), MARKDOWN_BULLET)
+            indent = fm.horizontalAdvance(MARKDOWN_BULLET + "  ")
+            line = line[2:].strip()
+
+        fms = {False: QFontMetricsF(regular), True: QFontMetricsF(bold)}
+        line_height = max(fms[False].height(), fms[True].height())
+        ascent = max(fms[False].ascent(), fms[True].ascent())
+        x = rect.left() + indent
+        for word, is_bold in _markdown_runs(line):
+            fm = fms[is_bold]
+            width = fm.horizontalAdvance(word)
+            if x > rect.left() + indent and x + width > rect.right():
+                x = rect.left() + indent
+                y += line_height
+            painter.setFont(bold if is_bold else regular)
+            painter.drawText(QPointF(x, y + ascent), word)
+            x += width + fm.horizontalAdvance(" ")
+        y += line_height
+    painter.restore()
+    return y - rect.top()
+
+
+def paint_sensor(painter, rect, reading, text_color):
+    """
+    Paints one SensorReading into `rect`: the formatted value and trend
+    triangle on the first line, min/max right-aligned, and the sparkline in
+    the space below. Shared by both backends (SensorWidget in widget_backend).
+    """
+    cfg = reading.config
+    show = cfg.get('show', SENSOR_DEFAULT_SHOW)
+    font = make_font(cfg.get('font_size', 10), cfg.get('font_bold', True))
+    fm = QFontMetricsF(font)
+    line = QRectF(rect.left(), rect.top(), rect.width(), min(fm.height(), rect.height()))
+
+    painter.save()
+    painter.setClipRect(rect)
+    painter.setFont(font)
+    painter.setPen(QColor(text_color))
+
+    x = line.left()
+    if "value" in show:
+        text = reading.text()
+        painter.drawText(line, Qt.AlignLeft | Qt.AlignVCenter, text)
+        x += fm.horizontalAdvance(text) + fm.averageCharWidth()
+    if "trend" in show and reading.value is not None:
+        # drawn as a shape, so it doesn't depend on the font having arrows
+        size = fm.ascent() * 0.6
+        cy = line.center().y()
+        path = QPainterPath()
+        if reading.trend > 0:
+            path.moveTo(x, cy + size / 2); path.lineTo(x + size, cy + size / 2); path.lineTo(x + size / 2, cy - size / 2)
+        elif reading.trend < 0:
+            path.moveTo(x, cy - size / 2); path.lineTo(x + size, cy - size / 2); path.lineTo(x + size / 2, cy + size / 2)
+        else:
+            path.addRect(QRectF(x, cy - 1, size, 2))
+        path.closeSubpath()
+        painter.fillPath(path, QColor(text_color))
+    if "minmax" in show and reading.minimum is not None:
+        painter.drawText(line, Qt.AlignRight | Qt.AlignVCenter, f"{reading.minimum:g}–{reading.maximum:g}")
+
+    spark = QRectF(rect.left(), line.bottom() + 2, rect.width(), rect.bottom() - line.bottom() - 2)
+    if "sparkline" in show and len(reading.values) > 1 and spark.height() > 2:
+        low, high = reading.minimum, reading.maximum
+        span = (high - low) or 1.0
+        step = spark.width() / (len(reading.values) - 1)
+        path = QPainterPath(QPointF(spark.left(), spark.bottom() - (reading.values[0] - low) / span * spark.height()))
+        for i, v in enumerate(reading.values[1:], 1):
+            path.lineTo(spark.left() + i * step, spark.bottom() - (v - low) / span * spark.height())
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.strokePath(path, QPen(QColor(text_color), SENSOR_SPARKLINE_WIDTH))
+    painter.restore()
+
+
+def weather_icon_uses_atlas(cfg):
+    """
+    Whether the weather_icon element is drawn from the icon atlas rather than as
+    an emoji label. Layouts from before the atlas have no "icon_geometry" and
+    keep the emoji, whose `geometry` box doesn't fit an icon.
+    """
+    return cfg.get('style', 'atlas' if 'icon_geometry' in cfg else 'emoji') != 'emoji'
+
+
+def forecast_icons_height(chart_cfg, daily_codes):
+    """Room the chart keeps under its day labels for the forecast icons; 0 when there are none to draw."""
+    cfg = chart_cfg.get('forecast_icons')
+    if not cfg or not daily_codes:
+        return 0
+    return cfg.get('size', FORECAST_ICON_SIZE) + cfg.get('spacing', FORECAST_ICON_SPACING)
+
+
+def stale_badge_text(since, clock):
+    """'stale since 14:05' (with the date when it isn't today), or 'offline' if there never was data."""
+    if not since:
+        return "offline"
+    when = datetime.fromtimestamp(since, clock.now.tzinfo)
+    if when.date() == clock.now.date():
+        return f"stale since {when:%H:%M}"
+    return f"stale since {when:%-d %b %H:%M}"
+
+
+def stale_badge_rect(element, text, canvas):
+    """
+    Top-right corner of the element's `stale_badge_geometry` (default: its
+    geometry), sized to the badge text.
+    """
+    rect = QRectF(*resolve_geometry(element.get('stale_badge_geometry', element.get('geometry', [0, 0, 100, 30])),
+                                    canvas))
+    metrics = QFontMetricsF(make_font(STALE_BADGE_FONT_SIZE, True))
+    width = metrics.horizontalAdvance(text) + 2 * STALE_BADGE_PADDING
+    height = metrics.height() + 2 * STALE_BADGE_PADDING
+    left = max(rect.left(), min(rect.right(), canvas[0]) - width)
+    return QRectF(left, max(rect.top(), 0), width, height)
+
+
+def paint_stale_badge(painter, rect, text, text_color, background_color):
+    painter.save()
+    painter.setPen(QPen(QColor(text_color), 1))
+    painter.setBrush(QColor(background_color))
+    painter.drawRect(rect)
+    painter.setFont(make_font(STALE_BADGE_FONT_SIZE, True))
+    painter.drawText(rect, Qt.AlignCenter, text)
+    painter.restore()
+
+
+class FrameData(NamedTuple):
+    """Everything a frame shows, read from the providers once for all outputs."""
+    weather_icon: str
+    weather_code: object # WMO code, None when unknown
+    daily_codes: tuple
+    temperature: str
+    status: str
+    highs: list
+    lows: list
+    agenda: object
+    notes_markdown: str
+    sysinfo: str
+    readings: list
+    stale: dict # provider name -> unix time its data is stale since
+
+
+class PainterDashboard:
+    """
+    Paints one dashboard frame from the providers onto QImages, one per output target.
+    """
+    def __init__(self, providers, clock, lite_markdown=False):
+        self.weather_provider = providers.weather_provider
+        self.home_status_provider = providers.home_status_provider
+        self.system_info_provider = providers.system_info_provider
+        self.event_list_provider = providers.event_list_provider
+        self.notes_provider = providers.notes_provider
+        self.sensor_provider = providers.sensor_provider
+        self.providers = providers
+        self.clock = clock
+        self.lite_markdown = lite_markdown
+
+        global_cfg = get_config_value(['global_settings'])
+        self.size = get_layout_size()
+        self.canvas = self.size # layout pixels of the output being painted
+        self.background_color = QColor(global_cfg.get('default_background_color', 'white'))
+        self.text_color = QColor(global_cfg.get('default_text_color', 'black'))
+        self._data = None
+        self._notes_documents = {} # text width -> laid out QTextDocument, shared by outputs
+
+    @property
+    def data(self):
+        if self._data is None:
+            now = self.clock.now
+            # one weather snapshot for the icon, temperature and chart
+            weather = self.weather_provider.get_weather_state()
+            highs, lows = weather.highs, weather.lows
+            self._data = FrameData(
+                weather_icon=weather.icon(),
+                weather_code=weather.weather_code,
+                daily_codes=tuple(weather.codes),
+                temperature=weather.temperature_text(),
+                status=self.home_status_provider.get_status(),
+                highs=highs,
+                lows=lows,
+                agenda=self.event_list_provider.get_agenda(now),
+                notes_markdown=self.notes_provider.get_notes_markdown(now),
+                sysinfo=self.system_info_provider.get_info(now),
+                readings=self.sensor_provider.get_readings(now),
+                stale=self.providers.stale(),
+            )
+        return self._data
+
+    def render(self, target=None):
+        """Paints the frame at the layout size, into `target` when it has that size."""
+        return self.render_output(OutputTarget("", *self.size), target)
+
+    def render_output(self, output, target=None):
+        """Paints the frame for one output target, into `target` when it has the output's image size."""
+        if target is not None and (target.width(), target.height()) == output.image_size:
+            image = target
+        else:
+            image = allocate_frame(output)
+        image.fill(self.background_color)
+        painter = QPainter(image)
+        try:
+            self.canvas = apply_output_transform(painter, output, self.size)
+            self.paint(painter)
+        finally:
+            painter.end()
+        return image
+
+    def render_outputs(self, outputs, targets=None):
+        """One image per output; `targets` optionally maps an output's file to a buffer to reuse."""
+        targets = targets or {}
+        return [self.render_output(output, targets.get(output.file)) for output in outputs]
+
+    def paint(self, painter):
+        self.paint_weather(painter)
+        self.paint_clock(painter)
+        self.paint_status(painter)
+        self.paint_chart(painter)
+        self.paint_calendar(painter)
+        self.paint_notes(painter)
+        self.paint_sysinfo(painter)
+        self.paint_sensors(painter)
+        self.paint_stale_badges(painter)
+
+    def _paint_label(self, painter, text, config_path_prefix):
+        """Paints text the way a QLabel configured by EInkDashboard._setup_label looks."""
+        cfg = get_config_value(['dashboard_elements', config_path_prefix])
+        if not cfg: return
+
+        rect = element_rect(cfg, [0, 0, 100, 30], self.canvas)
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setFont(make_font(cfg.get('font_size', 12), cfg.get('font_bold', False)))
+        painter.setPen(QColor(cfg.get('text_color', self.text_color)))
+        painter.drawText(rect, get_qt_alignment(cfg.get('alignment_h'), cfg.get('alignment_v')), text)
+        painter.restore()
+
+    def paint_weather(self, painter):
+        cfg = get_config_value(['dashboard_elements', 'weather_icon'])
+        if cfg and weather_icon_uses_atlas(cfg):
+            rect = QRectF(*resolve_geometry(cfg.get('icon_geometry', cfg.get('geometry', [5, -50, 175, 160])), self.canvas))
+            get_atlas().draw(painter, rect, self.data.weather_code, cfg.get('text_color', self.text_color))
+        else:
+            self._paint_label(painter, self.data.weather_icon, 'weather_icon')
+        self._paint_label(painter, self.data.temperature, 'sun_info')
+
+    def paint_clock(self, painter):
+        cfg_clock = get_config_value(['dashboard_elements', 'clock_label'])
+        cfg_date = get_config_value(['dashboard_elements', 'date_label'])
+        current_dt = self.clock.qt_now
+        self._paint_label(painter, current_dt.toString(cfg_clock.get('time_format', "HH:mm")), 'clock_label')
+        self._paint_label(painter, current_dt.toString(cfg_date.get('date_format', "dddd dd/MM")), 'date_label')
+
+    def paint_status(self, painter):
+        self._paint_label(painter, self.data.status, 'home_status')
+
+    def paint_chart(self, painter):
+        cfg = get_config_value(['dashboard_elements', 'chart_view'])
+        if not cfg: return
+
+        rect = element_rect(cfg, [-20, 195, 500, 285], self.canvas)
+        highs, lows = self.data.highs, self.data.lows
+        cfg_axis_x = cfg.get('axisX', {})
+        cfg_axis_y = cfg.get('axisY', {})
+
+        font_x = make_font(cfg_axis_x.get('labels_font_size', 12), cfg_axis_x.get('labels_font_bold', True))
+        font_y = make_font(cfg_axis_y.get('labels_font_size', 12), cfg_axis_y.get('labels_font_bold', True))
+        fm_x, fm_y = QFontMetricsF(font_x), QFontMetricsF(font_y)
+
+        y_min, y_max = cfg_axis_y.get('range_min', -10), cfg_axis_y.get('range_max', 40)
+        y_ticks = 5 # QValueAxis default tick count
+        label_format = cfg_axis_y.get('label_format', "%d'C")
+        y_values = [y_min + (y_max - y_min) * i / (y_ticks - 1) for i in range(y_ticks)]
+        y_labels = [label_format % v for v in y_values]
+        y_label_width = max(fm_y.horizontalAdvance(t) for t in y_labels)
+
+        plot = QRectF(rect)
+        plot.setLeft(rect.left() + CHART_MARGIN + y_label_width + CHART_Y_LABEL_SPACING)
+        plot.setTop(rect.top() + CHART_MARGIN + fm_y.height())
+        plot.setRight(rect.right() - CHART_MARGIN - CHART_RIGHT_PADDING)
+        plot.setBottom(rect.bottom() - CHART_MARGIN - fm_x.height() - CHART_X_LABEL_SPACING
+                       - forecast_icons_height(cfg, self.data.daily_codes))
+
+        def map_y(v):
+            return plot.bottom() - (v - y_min) / (y_max - y_min) * plot.height()
+
+        days = max(len(highs), len(lows), 2)
+        def map_x(i):
+            return plot.left() + i / (days - 1) * plot.width()
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, cfg.get('antialiasing', False))
+
+        # Axis lines and labels
+        painter.setPen(QPen(QColor(CHART_AXIS_LINE_COLOR), 1))
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+
+        painter.setFont(font_y)
+        painter.setPen(QColor(cfg_axis_y.get('labels_color', CHART_LABEL_COLOR)))
+        for v, text in zip(y_values, y_labels):
+            y = map_y(v)
+            label_rect = QRectF(plot.left() - CHART_Y_LABEL_SPACING - y_label_width, y - fm_y.height() / 2,
+                                y_label_width, fm_y.height())
+            painter.drawText(label_rect, Qt.AlignRight | Qt.AlignVCenter, text)
+
+        painter.setFont(font_x)
+        painter.setPen(QColor(cfg_axis_x.get('labels_color', CHART_LABEL_COLOR)))
+        x_ticks = cfg_axis_x.get('tick_count', 5)
+        x_format = cfg_axis_x.get('format', "ddd")
+        span_days = days - 1
+        for i in range(x_ticks):
+            offset = span_days * i / (x_ticks - 1) if x_ticks > 1 else 0
+            text = self.clock.qt_now.addSecs(int(offset * 86400)).toString(x_format)
+            width = fm_x.horizontalAdvance(text)
+            x = map_x(offset)
+            painter.drawText(QRectF(x - width / 2, plot.bottom() + CHART_X_LABEL_SPACING / 2, width, fm_x.height()),
+                             Qt.AlignCenter, text)
+
+        # Forecast icons under the day labels
+        if forecast_icons_height(cfg, self.data.daily_codes):
+            cfg_icons = cfg['forecast_icons']
+            size = cfg_icons.get('size', FORECAST_ICON_SIZE)
+            top = plot.bottom() + CHART_X_LABEL_SPACING / 2 + fm_x.height() + cfg_icons.get('spacing', FORECAST_ICON_SPACING)
+            color = cfg_icons.get('color', self.text_color)
+            for i, name in enumerate(conditions(self.data.daily_codes[:days])):
+                get_atlas().draw_condition(painter, QRectF(map_x(i) - size / 2, top, size, size), name, color)
+
+        # Series
+        painter.setClipRect(plot.adjusted(-10, -10, 10, 10))
+        for values, pen_key, width, style in ((highs, 'high_series_pen', 4, 'SolidLine'),
+                                              (lows, 'low_series_pen', 2, 'DashLine')):
+            cfg_pen = cfg.get(pen_key, {})
+            pen = QPen(QColor(cfg_pen.get('color', 'black')), cfg_pen.get('width', width))
+            pen.setStyle(get_qt_pen_style(cfg_pen.get('style', style)))
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            points = [QPointF(map_x(i), map_y(v)) for i, v in enumerate(values)]
+            if len(points) < 2: continue
+            first, second = spline_control_points(points)
+            path = QPainterPath(points[0])
+            for i in range(len(points) - 1):
+                path.cubicTo(first[i], second[i], points[i + 1])
+            painter.drawPath(path)
+        painter.restore()
+
+    def paint_calendar(self, painter):
+        cfg = get_config_value(['dashboard_elements', 'calendar_widget_instance'])
+        cal_cfg = get_config_value(['eink_calendar'])
+        rect = element_rect(cfg, [450, 205, 350, 280], self.canvas)
+        agenda = self.data.agenda
+        today = self.clock.qt_today
+
+        cell_w = rect.width() / CALENDAR_COLUMNS
+        cell_h = rect.height() / CALENDAR_ROWS
+        def cell_rect(row, col):
+            return QRectF(rect.left() + col * cell_w, rect.top() + row * cell_h, cell_w, cell_h).toRect()
+
+        painter.save()
+        painter.fillRect(rect, QColor(cal_cfg.get('background_color', 'white')))
+
+        # Header with the short day names, weekend in red like QCalendarWidget
+        locale = QLocale()
+        first_day = locale.firstDayOfWeek().value
+        painter.setFont(make_font(cal_cfg.get('header_font_size', 13), cal_cfg.get('header_font_bold', True)))
+        for col in range(CALENDAR_COLUMNS):
+            day_of_week = (first_day - 1 + col) % 7 + 1
+            r = cell_rect(0, col)
+            painter.fillRect(r, QColor(CALENDAR_HEADER_BACKGROUND))
+            painter.setPen(QColor(CALENDAR_WEEKEND_COLOR if day_of_week >= 6 else cal_cfg.get('text_color', 'black')))
+            painter.drawText(r, Qt.AlignCenter, locale.dayName(day_of_week, QLocale.ShortFormat))
+
+        # Six weeks starting with the week of the 1st; like QCalendarWidget, a
+        # month starting on the first day of the week is preceded by a full week
+        first_of_month = today.addDays(1 - today.day())
+        lead = (first_of_month.dayOfWeek() - first_day) % 7 or 7
+        date = first_of_month.addDays(-lead)
+
+        day_font = make_font(cal_cfg.get('font_size', 12), cal_cfg.get('font_bold', True))
+        line_width = cal_cfg.get('event_indicator_line_width', 2)
+        for row in range(1, CALENDAR_ROWS):
+            for col in range(CALENDAR_COLUMNS):
+                r = cell_rect(row, col)
+                # Same drawing rules as EInkCalendar.paintCell
+                if date == today:
+                    painter.fillRect(r, QColor(cal_cfg.get('current_date_fill_color', 'black')))
+                    painter.setPen(QColor(cal_cfg.get('current_date_text_color', 'white')))
+                else:
+                    painter.fillRect(r, QColor(cal_cfg.get('background_color', 'white')))
+                    painter.setPen(QColor(cal_cfg.get('text_color', 'black')))
+
+                if date != today and agenda.has_events(date.toPython()):
+                    painter.setPen(QPen(QColor(cal_cfg.get('event_indicator_line_color', 'black')), line_width))
+                    y = r.bottom() - (line_width + 2)
+                    painter.drawLine(r.left() + 4, y, r.right() - 4, y)
+                    painter.setPen(QColor(cal_cfg.get('text_color', 'black')))
+
+                painter.setFont(day_font)
+                painter.drawText(r, Qt.AlignCenter, str(date.day()))
+                date = date.addDays(1)
+        painter.restore()
+
+    def paint_notes(self, painter):
+        cfg = get_config_value(['dashboard_elements', 'notes_text_edit'])
+        if not cfg: return
+
+        rect = element_rect(cfg, [550, 5, 240, 190], self.canvas)
+        font = make_font(cfg.get('font_size', 10), cfg.get('font_bold', False))
+        markdown = self.data.notes_markdown
+        text_color = cfg.get('text_color', get_config_value(['global_settings', 'default_text_color'], 'black'))
+        bg_color = cfg.get('background_color', 'transparent')
+        if bg_color != 'transparent':
+            painter.fillRect(rect, QColor(bg_color))
+
+        if self.lite_markdown:
+            margin = NOTES_DOCUMENT_MARGIN
+            paint_markdown_lite(painter, rect.adjusted(margin, margin, -margin, -margin), markdown, font, text_color)
+            return
+
+        # outputs with the same notes width share one layout
+        doc = self._notes_documents.get(rect.width())
+        if doc is None:
+            doc = QTextDocument()
+            doc.setDocumentMargin(NOTES_DOCUMENT_MARGIN)
+            doc.setDefaultFont(font)
+            doc.setTextWidth(rect.width())
+            doc.setMarkdown(markdown)
+            self._notes_documents[rect.width()] = doc
+
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.Text, QColor(text_color))
+        context.clip = QRectF(0, 0, rect.width(), rect.height())
+
+        painter.save()
+        painter.translate(rect.topLeft())
+        painter.setClipRect(context.clip)
+        doc.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def paint_sysinfo(self, painter):
+        self._paint_label(painter, self.data.sysinfo, 'sysinfo_label')
+
+    def paint_sensors(self, painter):
+        for reading in self.data.readings:
+            rect = element_rect(reading.config, [0, 0, 200, 40], self.canvas)
+            paint_sensor(painter, rect, reading, reading.config.get('text_color', self.text_color))
+
+    def paint_stale_badges(self, painter):
+        for name, since in self.data.stale.items():
+            element = get_config_value(['dashboard_elements', STALE_BADGE_ELEMENTS[name]])
+            if not element: continue
+            text = stale_badge_text(since, self.clock)
+            paint_stale_badge(painter, stale_badge_rect(element, text, self.canvas), text,
+                              self.text_color, self.background_color)
@@ -0,0 +1,145 @@
+import bisect
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+ONE_DAY = datetime.timedelta(days=1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class EventRecord(NamedTuple):
+    """
+    A calendar event parsed once into comparable datetimes.
+    `start`/`end` are timezone aware; all-day events start at local midnight and
+    keep the exclusive end date of the Calendar API.
+    """
+    start: datetime.datetime
+    end: datetime.datetime
+    all_day: bool
+    summary: str
+    event: Optional[Dict]
+
+
+def parse_event_time(value: Dict, tz: Optional[datetime.tzinfo] = None) -> Optional[datetime.datetime]:
+    """
+    Parse a Calendar API `start`/`end` object into an aware datetime.
+    Timed values are converted to `tz` when given; dates become midnight in
+    `tz` (UTC by default).
+    """
+    if 'dateTime' in value:
+        dt = datetime.datetime.fromisoformat(value['dateTime'])
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=tz or datetime.timezone.utc)
+        return dt.astimezone(tz) if tz is not None else dt
+    if 'date' in value:
+        d = datetime.date.fromisoformat(value['date'])
+        return datetime.datetime(d.year, d.month, d.day, tzinfo=tz or datetime.timezone.utc)
+    return None
+
+
+def parse_event(ev: Dict, start: Optional[datetime.datetime] = None,
+                tz: Optional[datetime.tzinfo] = None, keep_event: bool = True) -> Optional[EventRecord]:
+    """
+    Build an EventRecord from a raw event, or None if it has no usable start.
+    An already parsed `start` can be passed in to avoid parsing it twice.
+    Without `keep_event` the record doesn't reference the raw dict, so the
+    API payload can be freed once it is parsed.
+    """
+    s = ev.get('start', {})
+    if start is None:
+        start = parse_event_time(s, tz)
+        if start is None:
+            return None
+    end = parse_event_time(ev.get('end', {}), tz) or start
+    return EventRecord(start, end, 'date' in s, ev.get('summary', '(no title)'), ev if keep_event else None)
+
+
+class DayAgenda(NamedTuple):
+    """
+    Summary of one local day: how many events touch it, the earliest start among
+    them and whether any of them is an all-day event.
+    """
+    count: int
+    first_start: datetime.datetime
+    has_all_day: bool
+    records: Tuple[EventRecord, ...]
+
+
+def _local_day_span(rec: EventRecord) -> Tuple[datetime.date, datetime.date]:
+    """
+    First and last local date covered by a record parsed in the index timezone.
+    All-day events use the exclusive end date of the API; timed events cover
+    every local day their [start, end) interval intersects.
+    """
+    first = rec.start.date()
+    if rec.all_day:
+        last = rec.end.date() - ONE_DAY
+    elif rec.end > rec.start:
+        last = (rec.end - ONE_MICROSECOND).date()
+    else:
+        last = first
+    return first, max(first, last)
+
+
+class AgendaIndex:
+    """
+    Events of one snapshot bucketed per local day in a single timezone.
+    Built once, then queried in O(1) per day by the calendar and the notes.
+    """
+    def __init__(self, records: Iterable[EventRecord], timezone_name: str = "UTC"):
+        # records are expected to be parsed in `timezone_name`, see from_events()
+        self.timezone_name = timezone_name
+        self.tz = ZoneInfo(timezone_name)
+        self._records: List[EventRecord] = sorted(records, key=lambda rec: rec.start)
+        self._starts = [rec.start for rec in self._records]
+
+        buckets: Dict[datetime.date, List[EventRecord]] = {}
+        for rec in self._records:
+            day, last = _local_day_span(rec)
+            buckets.setdefault(day, []).append(rec)
+            while day < last:
+                day += ONE_DAY
+                buckets.setdefault(day, []).append(rec)
+
+        self._days: Dict[datetime.date, DayAgenda] = {
+            day: DayAgenda(len(recs), recs[0].start, any(r.all_day for r in recs), tuple(recs))
+            for day, recs in buckets.items()
+        }
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict], timezone_name: str = "UTC",
+                    keep_events: bool = True) -> "AgendaIndex":
+        tz = ZoneInfo(timezone_name)
+        records = (parse_event(ev, tz=tz, keep_event=keep_events) for ev in events)
+        return cls((rec for rec in records if rec is not None), timezone_name)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[List], timezone_name: str = "UTC") -> "AgendaIndex":
+        """Rebuilds an index saved with to_rows(); the records carry no raw event."""
+        tz = ZoneInfo(timezone_name)
+        return cls((EventRecord(datetime.datetime.fromisoformat(start).astimezone(tz),
+                                datetime.datetime.fromisoformat(end).astimezone(tz), all_day, summary, None)
+                    for start, end, all_day, summary in rows), timezone_name)
+
+    def to_rows(self) -> List[List]:
+        """The records as JSON-able [start, end, all_day, summary] rows, see from_rows()."""
+        return [[rec.start.isoformat(), rec.end.isoformat(), rec.all_day, rec.summary] for rec in self._records]
+
+    def __len__(self):
+        return len(self._records)
+
+    def day(self, day: datetime.date) -> Optional[DayAgenda]:
+        return self._days.get(day)
+
+    def has_events(self, day: datetime.date) -> bool:
+        return day in self._days
+
+    def dates(self) -> List[datetime.date]:
+        return sorted(self._days)
+
+    def upcoming(self, now: datetime.datetime, n: int) -> List[EventRecord]:
+        """
+        Return the first `n` records starting on or after `now`, in start order.
+        """
+        i = bisect.bisect_left(self._starts, now)
+        return self._records[i:i + n]
@@ -1,10 +1,15 @@
 import pickle
 import datetime
 import os.path
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 import json
+import logging
+import sys
+import time
+
+from .agenda_index import AgendaIndex
+from zoneinfo import ZoneInfo
+
+log = logging.getLogger(__name__)
 
 
 # If modifying these scopes, delete the file token.pickle.
@@ -12,8 +17,45 @@ SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 CREDENTIALS_FILE = os.getenv("GOOGLE_CALENDAR_CREDENTIAL_FILE")
 SECRET_FOLDER = os.getenv("SECRET_FOLDER")
+# Base URL of a Calendar API stand-in, e.g. "http://127.0.0.1:8080/calendar/v3/"
+# (see test/standins/calendar_api.py); skips OAuth entirely when set
+API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+# Whether an expired or missing token may start the browser OAuth flow:
+# "auto" only when attached to a terminal, "1" always, "0" never (cron, Docker)
+INTERACTIVE_AUTH = os.getenv("INTERACTIVE_AUTH", "auto")
+# Seconds a single Calendar API request may take
+CALENDAR_HTTP_TIMEOUT = float(os.getenv("CALENDAR_HTTP_TIMEOUT", "20"))
+
+
+class AuthorizationRequired(RuntimeError):
+    """The Calendar token needs the interactive OAuth flow, which isn't allowed here."""
+
+
+def interactive_auth_allowed():
+    if INTERACTIVE_AUTH == "auto":
+        return sys.stdin is not None and sys.stdin.isatty()
+    return INTERACTIVE_AUTH == "1"
+
+
+def _authorized_http(creds):
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    return AuthorizedHttp(creds, http=httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT))
+
 
 def get_calendar_service():
+    # The Google client libraries are imported on first use: they cost tens of
+    # MB and are only needed while refreshing
+    from googleapiclient.discovery import build
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+    from google.auth.credentials import AnonymousCredentials
+    from google.auth.exceptions import RefreshError
+
+    if API_ENDPOINT:
+        return build('calendar', 'v3', http=_authorized_http(AnonymousCredentials()),
+                     client_options={'api_endpoint': API_ENDPOINT}, cache_discovery=False)
+
     creds = None
     # The file token.pickle stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -23,9 +65,19 @@ def get_calendar_service():
             creds = pickle.load(token)
     # If there are no (valid) credentials available, let the user log in.
     if not creds or not creds.valid:
+        refreshed = False
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
+            try:
+                creds.refresh(Request())
+                refreshed = True
+            except RefreshError as e:
+                # a revoked or expired refresh token needs the user again
+                if not interactive_auth_allowed():
+                    raise AuthorizationRequired(f"Calendar token refresh failed: {e}") from e
+        if not refreshed:
+            if not interactive_auth_allowed():
+                raise AuthorizationRequired("Calendar token missing or invalid; run once from a terminal "
+                                            "(or with INTERACTIVE_AUTH=1) to authorize")
             flow = InstalledAppFlow.from_client_secrets_file(
                 CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=0)
@@ -33,112 +85,137 @@ def get_calendar_service():
         with open(SECRET_FOLDER + 'token.pickle', 'wb') as token:
             pickle.dump(creds, token)
 
-    service = build('calendar', 'v3', credentials=creds)
+    service = build('calendar', 'v3', http=_authorized_http(creds))
     return service
 
 class EventsProvider:
-    def __init__(self):
-        self._cached_events = []
-        
+    def __init__(self, timezone_name="UTC", keep_raw_events=True):
+        """
+        With `keep_raw_events` False only the parsed agenda of a snapshot is
+        kept (records without the raw dicts) and get_events() returns [].
+        """
+        self.timezone_name = timezone_name
+        self.keep_raw_events = keep_raw_events
+        self._cached_events = None
+        self._agenda = None
+        self.updated = None # unix time of the last successful refresh
+        self.refresh_failing = False
+
     def _get_list_of_calendars(self, service):
-        print('Getting list of calendars')
-        calendars_result = service.calendarList().list().execute()
+        log.debug('Getting list of calendars')
+        calendars = []
+        request = service.calendarList().list()
+        while request is not None:
+            calendars_result = request.execute()
+            calendars.extend(calendars_result.get('items', []))
+            request = service.calendarList().list_next(request, calendars_result)
 
-        calendars = calendars_result.get('items', [])
         calendar_ids = [] 
         if not calendars:
-            print('No calendars found.')
+            log.warning('No calendars found.')
         for calendar in calendars:
             summary = calendar['summary']
             id = calendar['id']
             calendar_ids.append(id)
             primary = "Primary" if calendar.get('primary') else ""
 
-            print("%s\t%s\t%s" % (summary, id, primary))
+            log.debug("%s\t%s\t%s", summary, id, primary)
 
         return calendar_ids
     
-    def _get_this_month_events(self, service, calendar_id):
-        if len(self._cached_events) > 0:
-            return self._cached_events
-        
-        # 1) Compute UTC bounds for “this month”
-        now = datetime.datetime.utcnow()
-        start_of_month = datetime.datetime(now.year, now.month, 1, 0, 0, 0)
+    def _get_this_month_events(self, service, calendar_id, now):
+        # 1) Compute the bounds of “this month” in the configured timezone, sent as UTC
+        tz = ZoneInfo(self.timezone_name)
+        now = now.astimezone(tz)
+        start_of_month = datetime.datetime(now.year, now.month, 1, tzinfo=tz)
         # roll over into next month
         if now.month == 12:
-            start_of_next = datetime.datetime(now.year+1, 1, 1, 0, 0, 0)
+            start_of_next = datetime.datetime(now.year+1, 1, 1, tzinfo=tz)
         else:
-            start_of_next = datetime.datetime(now.year, now.month+1, 1, 0, 0, 0)
+            start_of_next = datetime.datetime(now.year, now.month+1, 1, tzinfo=tz)
 
-        timeMin = start_of_month.isoformat() + "Z"   # e.g. "2025-05-01T00:00:00Z"
-        timeMax = start_of_next.isoformat() + "Z"    # e.g. "2025-06-01T00:00:00Z"
+        utc = datetime.timezone.utc
+        timeMin = start_of_month.astimezone(utc).strftime("%Y-%m-%dT%H:%M:%SZ")   # e.g. "2025-04-30T22:00:00Z"
+        timeMax = start_of_next.astimezone(utc).strftime("%Y-%m-%dT%H:%M:%SZ")    # e.g. "2025-05-31T22:00:00Z"
 
-        print(f"Getting events from {timeMin} to {timeMax}")
-        events_result = service.events().list(
+        log.debug("Getting events from %s to %s", timeMin, timeMax)
+        events = []
+        request = service.events().list(
             calendarId=calendar_id,
             timeMin=timeMin,
             timeMax=timeMax,
             singleEvents=True,
             orderBy='startTime'
-        ).execute()
+        )
+        # follow nextPageToken; busy calendars span several pages
+        while request is not None:
+            events_result = request.execute()
+            events.extend(events_result.get('items', []))
+            request = service.events().list_next(request, events_result)
 
-        events = events_result.get('items', [])
         if not events:
-            print('No events found this month.')
+            log.info('No events found this month.')
         else:
             for event in events:
                 start = event['start'].get('dateTime', event['start'].get('date'))
-                print(start, event.get('summary', '(no title)'))
+                log.debug("%s %s", start, event.get('summary', '(no title)'))
 
         return events
     
     def extract_all_dates(events):
-        dates = set()
-
-        for ev in events:
-            s = ev.get('start', {})
-            e = ev.get('end', {})
-
-            # Determine if this is an all-day event or a timed event
-            if 'date' in s and 'date' in e:
-                # all-day: end.date is exclusive
-                start_date = datetime.datetime.fromisoformat(s['date']).date()
-                end_date   = datetime.datetime.fromisoformat(e['date']).date()
-                exclusive  = True
-            elif 'dateTime' in s and 'dateTime' in e:
-                # timed: include the end date if it differs
-                start_date = datetime.datetime.fromisoformat(s['dateTime']).date()
-                end_date   = datetime.datetime.fromisoformat(e['dateTime']).date()
-                exclusive  = False
-            else:
-                # skip events without a clear start/end
-                continue
-
-            # iterate dates
-            cur = start_date
-            if exclusive:
-                while cur < end_date:
-                    dates.add(cur)
-                    cur += datetime.timedelta(days=1)
-            else:
-                # inclusive of end_date
-                while cur <= end_date:
-                    dates.add(cur)
-                    cur += datetime.timedelta(days=1)
-
-        # return a sorted list
-        return sorted(dates)
+        """
+        Sorted list of UTC dates that have at least one event.
+        Kept for callers without an agenda; the dashboard uses get_agenda().
+        """
+        return AgendaIndex.from_events(events).dates()
     
-    def get_events(self):
-        service = get_calendar_service()
-        calendars = self._get_list_of_calendars(service)
-        
-        events = []
-        for calendar in calendars:
-            event = self._get_this_month_events(service, calendar)
-            if event is not None:
-                events.extend(event)
-        print("#######################")
-        print(json.dumps(events, indent=2, ensure_ascii=False))
+    def refresh(self, now=None):
+        """
+        Fetch a new events snapshot and drop the agenda built from the old one.
+        `now` is the frame clock and selects the month to fetch.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        try:
+            service = get_calendar_service()
+            calendars = self._get_list_of_calendars(service)
+
+            events = []
+            for calendar in calendars:
+                event = self._get_this_month_events(service, calendar, now)
+                if event is not None:
+                    events.extend(event)
+        except Exception:
+            self.refresh_failing = True
+            raise
+        self.updated = time.time()
+        self.refresh_failing = False
+        log.info("Fetched %d events from %d calendars", len(events), len(calendars))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Events: %s", json.dumps(events, indent=2, ensure_ascii=False))
+        if self.keep_raw_events:
+            self._cached_events = events
+            self._agenda = None
+        else:
+            self._cached_events = []
+            self._agenda = AgendaIndex.from_events(events, self.timezone_name, keep_events=False)
         return events
+
+    def stale_since(self):
+        """When the snapshot still shown was fetched, if refreshing it has failed since."""
+        return self.updated if self.refresh_failing and self.updated is not None else None
+
+    def get_events(self, now=None):
+        if self._cached_events is None:
+            self.refresh(now)
+        return self._cached_events
+
+    def get_agenda(self, now=None):
+        """
+        Per-day index of the current snapshot in the configured timezone,
+        built at most once per snapshot and shared by every widget.
+        """
+        if self._agenda is None:
+            events = self.get_events(now)
+            if self._agenda is None: # a refresh without raw events builds it right away
+                self._agenda = AgendaIndex.from_events(events, self.timezone_name)
+        return self._agenda
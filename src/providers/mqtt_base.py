@@ -0,0 +1,181 @@
+"""
+Shared MQTT plumbing for the broker-backed providers.
+
+The paho network thread only stores the latest raw payload per topic, so a
+burst on a chatty broker costs one dict assignment per message. Payloads are
+parsed and validated on the render thread when a snapshot is read, and applied
+to an immutable state tuple that is swapped in whole, so a render never sees
+fields from two different messages half-applied.
+
+Install with: pip install paho-mqtt
+"""
+import paho.mqtt.client as mqtt
+import logging
+import threading
+import time
+
+from metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+
+MQTT_MESSAGES = REGISTRY.counter(
+    "dashboard_mqtt_messages_total", "MQTT messages by outcome: received, coalesced (replaced before a frame read them) "
+    "or rejected (invalid payload)", ["client", "outcome"])
+MQTT_LAST_MESSAGE = REGISTRY.gauge(
+    "dashboard_mqtt_last_message_timestamp_seconds", "Unix time of the last MQTT message received", ["client"])
+MQTT_CONNECTED = REGISTRY.gauge("dashboard_mqtt_connected", "1 while the client is connected to its broker", ["client"])
+
+
+class PayloadError(ValueError):
+    """A payload that doesn't match the schema its topic expects."""
+
+
+def require_number(data, key):
+    value = data.get(key) if isinstance(data, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise PayloadError(f"'{key}' must be a number, got {value!r}")
+    return value
+
+
+def require_numbers(data, key):
+    values = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(values, list) or any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in values):
+        raise PayloadError(f"'{key}' must be a list of numbers, got {values!r}")
+    return tuple(values)
+
+
+class MqttProvider:
+    """
+    Base for providers fed by MQTT topics.
+
+    Subclasses pass `parsers`, a {topic: parse(payload_str) -> {field: value}}
+    mapping, and an `initial_state` NamedTuple; parse functions raise
+    PayloadError (or ValueError/KeyError/TypeError) to reject a payload, which
+    keeps the previous state. Getters read `self.snapshot()`.
+
+    The client connects in the background and keeps reconnecting (with
+    backoff), so an unreachable broker never blocks start(); has_data() and
+    stale_since() tell whether the state is real and still being updated.
+    """
+    def __init__(self, client_id, broker, port, username, password, parsers, initial_state):
+        self._running = False
+        self.client_id = client_id
+        self.broker = broker
+        self.port = port
+        self.username = username
+        self.password = password
+        self.parsers = parsers
+        self.client = mqtt.Client(client_id)
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self._on_message
+        self.client.on_disconnect = self._on_disconnect
+        self._state = initial_state
+        self._pending = {} # topic -> latest raw payload, not parsed yet
+        self._pending_lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        self.received = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._applied = False # set once a valid payload replaced the initial placeholder
+        self.connected = False
+        self.disconnected_since = None # unix time the broker was lost (or start() was called)
+        # metric children bound once: messages are counted on the network thread
+        self._received_metric = MQTT_MESSAGES.labels(client_id, "received")
+        self._coalesced_metric = MQTT_MESSAGES.labels(client_id, "coalesced")
+        self._rejected_metric = MQTT_MESSAGES.labels(client_id, "rejected")
+        self._last_message_metric = MQTT_LAST_MESSAGE.labels(client_id)
+        self._connected_metric = MQTT_CONNECTED.labels(client_id)
+
+    # Callback when the client connects to the broker
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            log.info("%s connected to MQTT broker %s:%s", self.client_id, self.broker, self.port)
+            self.connected = True
+            self.disconnected_since = None
+            self._connected_metric.set(1)
+            # Subscribe to topic upon successful connection
+            for topic in self.parsers:
+                client.subscribe(topic, qos=1)
+        else:
+            log.error("%s failed to connect, return code %s", self.client_id, rc)
+
+    def _on_disconnect(self, client, userdata, rc):
+        if self.connected:
+            self.connected = False
+            self.disconnected_since = time.time()
+            self._connected_metric.set(0)
+            log.warning("%s disconnected from MQTT broker, return code %s; reconnecting", self.client_id, rc)
+
+    # Callback when a message is received from the broker; runs on the network thread
+    def _on_message(self, client, userdata, msg):
+        if msg.topic not in self.parsers:
+            return
+        with self._pending_lock:
+            if msg.topic in self._pending:
+                self.coalesced += 1
+                self._coalesced_metric.inc()
+            self._pending[msg.topic] = msg.payload
+            self.received += 1
+        self._count_received()
+
+    def _count_received(self):
+        self._received_metric.inc()
+        self._last_message_metric.set(time.time())
+
+    def snapshot(self):
+        """Applies the payloads received since the last call and returns the current state."""
+        with self._apply_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return self._state
+                pending, self._pending = self._pending, {}
+
+            state = self._state
+            for topic, payload in pending.items():
+                try:
+                    text = payload.decode() if isinstance(payload, bytes) else payload
+                    state = state._replace(**self.parsers[topic](text))
+                    self._applied = True
+                except (ValueError, KeyError, TypeError) as e:
+                    self.rejected += 1
+                    self._rejected_metric.inc()
+                    log.warning("Ignoring invalid payload on `%s`: %s", topic, e)
+            self._state = state
+            return state
+
+    def has_data(self):
+        """Whether a valid payload was applied yet, i.e. the state isn't just the initial placeholder."""
+        return self._applied
+
+    def stale_since(self):
+        """Unix time the broker was lost while the client should be connected, else None."""
+        return self.disconnected_since if self._running and not self.connected else None
+
+    def start(self):
+        """
+        Connect to the broker and start the network loop in the background.
+        """
+        if not self._running:
+            self.client.username_pw_set(username=self.username, password=self.password)
+            try:
+                # the network thread connects, and reconnects after a drop, on its own
+                self.client.reconnect_delay_set(min_delay=1, max_delay=120)
+                self.client.connect_async(self.broker, self.port, keepalive=60)
+                self.disconnected_since = time.time()
+                self.client.loop_start()
+                self._running = True
+                log.info("%s MQTT client loop started", self.client_id)
+            except Exception as e:
+                log.error("%s could not connect to MQTT broker: %s", self.client_id, e)
+                return
+
+    def stop(self):
+        """
+        Stop the network loop and disconnect cleanly.
+        """
+        if self._running:
+            self.client.loop_stop()
+            self.client.disconnect()
+            self._running = False
+            log.info("%s MQTT client loop stopped and disconnected", self.client_id)
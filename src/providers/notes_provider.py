@@ -1,26 +1,48 @@
 from .events_provider import EventsProvider
-from datetime import datetime, timezone
-from typing import List, Dict
+from .agenda_index import AgendaIndex, EventRecord
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Dict
 
 import os
 
-MAX_ITEM_LIST_IN_NOTES = int(os.getenv("MAX_ITEM_LIST_IN_NOTES"))
-
-def get_formatted_dt_from_event(ev, key):
-    not_parsed_key = ev.get(key, {})
-    dt = None
-    
-    # parse dateTime (timed events) or date (all-day)
-    if 'dateTime' in not_parsed_key:
-        dt_parsed = datetime.fromisoformat(not_parsed_key['dateTime'])
-        # ensure UTC
-        dt = dt_parsed.astimezone(timezone.utc)
-    elif 'date' in not_parsed_key:
-        # treat all-day as start of the day UTC
-        dt_parsed = datetime.fromisoformat(not_parsed_key['date'])
-        dt = datetime(dt_parsed.year, dt_parsed.month, dt_parsed.day, tzinfo=timezone.utc)
-
-    return dt
+MAX_ITEM_LIST_IN_NOTES = int(os.getenv("MAX_ITEM_LIST_IN_NOTES", "5"))
+
+def format_day_heading(day) -> str:
+    return day.strftime('%a %-d %b')
+
+
+def format_record_line(rec: EventRecord) -> str:
+    """
+    One Markdown list item for an event. All-day events show no time and
+    multi-day events show their last day.
+    """
+    if rec.all_day:
+        # all-day end dates are exclusive
+        last_day = (rec.end - timedelta(days=1)).date()
+        line = f"-  {rec.summary}"
+    else:
+        last_day = rec.end.date()
+        line = f"-  {rec.start.strftime('%H:%M')} {rec.summary}"
+    if last_day > rec.start.date():
+        line += f" → {last_day.strftime('%-d %b')}"
+    return line + "\n"
+
+
+def iter_notes_markdown(records: Iterable[EventRecord]) -> Iterator[str]:
+    """
+    Yield the notes Markdown chunk by chunk, grouping events under a heading
+    per start day. Records must already be ordered by start.
+    """
+    yield "## Upcoming Events\n"
+    current_day = None
+    for rec in records:
+        day = rec.start.date()
+        if day != current_day:
+            current_day = day
+            yield f"\n**{format_day_heading(day)}**\n\n"
+        yield format_record_line(rec)
+
+
 class NotesProvider:
     def __init__(self, event_provider : EventsProvider ):
         self.event_provider = event_provider
@@ -28,34 +50,20 @@ class NotesProvider:
     def get_first_n_upcoming_events(events: List[Dict], n: int = 5) -> List[Dict]:
         """
         Return the first `n` upcoming events based on the current UTC time.
-        
+
         Args:
             events: List of event dictionaries (as from Google Calendar API).
             n: Number of upcoming events to return (default 5).
-            
+
         Returns:
             A list of up to `n` event dicts that start on or after now.
         """
         now = datetime.now(timezone.utc)
-        upcoming = []
-        
-        for ev in events:
-            dt = get_formatted_dt_from_event(ev, "start")           
-            if dt and dt >= now:
-                upcoming.append((dt, ev))
-        
-        # sort by start datetime and return first n events
-        upcoming.sort(key=lambda x: x[0])
-        return [ev for _, ev in upcoming[:n]]
-
-    def get_notes_markdown(self):
-        events_return_text = "## Upcoming Events\n"
-        events = self.event_provider.get_events()
-        first_5 = NotesProvider.get_first_n_upcoming_events(events, MAX_ITEM_LIST_IN_NOTES)
-        for ev in first_5:
-            start = get_formatted_dt_from_event(ev, "start")
-            end = get_formatted_dt_from_event(ev, "end")
-
-            events_return_text += f"-  {ev['summary']} \n"
-            events_return_text += f"\n   {start.strftime('%-d %b')} / {end.strftime('%-d %b')} \n"
-        return events_return_text
+        return [rec.event for rec in AgendaIndex.from_events(events).upcoming(now, n)]
+
+    def get_notes_markdown(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        agenda = self.event_provider.get_agenda(now)
+        # the shared agenda already holds parsed records in local time, ordered by start
+        first_n = agenda.upcoming(now, MAX_ITEM_LIST_IN_NOTES)
+        return "".join(iter_notes_markdown(first_n))
@@ -0,0 +1,193 @@
+"""
+Sensors declared in the "sensors" list of ui_config.json, e.g.
+
+    {"name": "Living room", "topic": "homeassistant/sensor/temperature/state",
+     "unit": "°C", "format": "{name} {value:.1f}{unit}", "history": 288,
+     "sample_seconds": 300, "show": ["value", "minmax", "trend", "sparkline"],
+     "geometry": [280, 176, 200, 18]}
+
+Every sensor keeps its samples in a fixed-size ring buffer (two float arrays),
+so memory is bounded by `history` whatever the broker sends, and all sensors
+share one MQTT client and network thread.
+"""
+from array import array
+from typing import NamedTuple, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from .mqtt_base import MqttProvider, PayloadError
+
+# Usually the Home Assistant broker, so the home status settings are the default
+BROKER = os.getenv("SENSORS_MQTT_BROKER", os.getenv("HOME_STATUS_MQTT_BROKER"))
+PORT = int(os.getenv("SENSORS_MQTT_PORT", os.getenv("HOME_STATUS_MQTT_PORT", "1883")))
+CLIENT_ID = "sensor-provider-client"
+USERNAME = os.getenv("SENSORS_MQTT_USERNAME", os.getenv("HOME_STATUS_MQTT_USERNAME"))
+PASSWORD = os.getenv("SENSORS_MQTT_PASSWORD", os.getenv("HOME_STATUS_MQTT_PASSWORD"))
+
+DEFAULT_HISTORY = 288 # a day of 5 minute samples
+DEFAULT_FORMAT = "{name} {value:g}{unit}"
+DEFAULT_TREND_SECONDS = 3600
+
+
+class SensorBuffer:
+    """
+    Fixed-capacity ring buffer of (timestamp, value) samples.
+    Samples arriving less than `min_interval` seconds after the one that opened
+    the newest slot replace it instead of taking a new slot, which downsamples
+    chatty sensors to one (latest) value per interval.
+    """
+    def __init__(self, capacity, min_interval=0.0):
+        self.capacity = max(1, int(capacity))
+        self.min_interval = min_interval
+        self._times = array('d', bytes(8 * self.capacity))
+        self._values = array('d', bytes(8 * self.capacity))
+        self._next = 0 # slot the next sample goes to
+        self._count = 0
+        self._slot_started = 0.0 # arrival of the first sample in the newest slot
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        newest = (self._next - 1) % self.capacity
+        if self._count and timestamp - self._slot_started < self.min_interval:
+            self._times[newest] = timestamp
+            self._values[newest] = value
+            return
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._slot_started = timestamp
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered(self, data):
+        if self._count < self.capacity:
+            return data[:self._count]
+        return data[self._next:] + data[:self._next]
+
+    def times(self):
+        """Timestamps, oldest first."""
+        return self._ordered(self._times)
+
+    def values(self):
+        """Values, oldest first."""
+        return self._ordered(self._values)
+
+    def last(self):
+        """(timestamp, value) of the newest sample, or None."""
+        if not self._count:
+            return None
+        newest = (self._next - 1) % self.capacity
+        return self._times[newest], self._values[newest]
+
+    def trend(self, window, threshold=0.0):
+        """
+        1, -1 or 0: whether the newest value is above, below or within
+        `threshold` of the oldest value of the last `window` seconds.
+        """
+        if self._count < 2:
+            return 0
+        times, values = self.times(), self.values()
+        since = times[-1] - window
+        oldest = next(i for i, t in enumerate(times) if t >= since)
+        delta = values[-1] - values[oldest]
+        if abs(delta) <= threshold:
+            return 0
+        return 1 if delta > 0 else -1
+
+
+class SensorReading(NamedTuple):
+    """A consistent copy of one sensor's buffer, taken for a frame."""
+    name: str
+    unit: str
+    value: Optional[float]
+    updated: Optional[float]
+    minimum: Optional[float]
+    maximum: Optional[float]
+    trend: int
+    values: Tuple[float, ...]
+    config: dict
+
+    def text(self):
+        if self.value is None:
+            return f"{self.name} N/A{self.unit}"
+        return self.config.get('format', DEFAULT_FORMAT).format(name=self.name, value=self.value, unit=self.unit)
+
+
+def parse_sensor_value(payload, value_key=None):
+    """A plain number, or the `value_key` field of a JSON object payload."""
+    if value_key is None:
+        return float(payload.strip())
+    data = json.loads(payload)
+    for key in value_key.split('.'):
+        if not isinstance(data, dict) or key not in data:
+            raise PayloadError(f"'{value_key}' missing")
+        data = data[key]
+    if isinstance(data, bool):
+        raise PayloadError(f"'{value_key}' must be a number, got {data!r}")
+    return float(data)
+
+
+class SensorProvider(MqttProvider):
+    """
+    Feeds the configured sensors. Unlike the coalescing single-value providers,
+    every message is sampled into its buffer on arrival, so trends and
+    sparklines see the whole history between frames.
+    """
+    def __init__(self, sensors, time_fn=time.time):
+        self.sensors = [dict(s) for s in sensors if s.get('topic')]
+        self._buffers = [SensorBuffer(s.get('history', DEFAULT_HISTORY), s.get('sample_seconds', 0))
+                         for s in self.sensors]
+        by_topic = {}
+        for i, sensor in enumerate(self.sensors):
+            by_topic.setdefault(sensor['topic'], []).append(i)
+        self._by_topic = by_topic
+        self._buffer_lock = threading.Lock()
+        self._time = time_fn
+        super().__init__(CLIENT_ID, BROKER, PORT, USERNAME, PASSWORD, dict.fromkeys(by_topic), None)
+
+    def _on_message(self, client, userdata, msg):
+        indexes = self._by_topic.get(msg.topic)
+        if not indexes:
+            return
+        now = self._time()
+        try:
+            text = msg.payload.decode()
+            samples = [(i, parse_sensor_value(text, self.sensors[i].get('value_key'))) for i in indexes]
+        except (ValueError, KeyError, TypeError):
+            # Home Assistant publishes 'unavailable'/'unknown'; keep the history as it is
+            self.rejected += 1
+            self._rejected_metric.inc()
+            return
+        with self._buffer_lock:
+            for i, value in samples:
+                self._buffers[i].append(now, value)
+            self.received += 1
+        self._count_received()
+
+    def start(self):
+        if self.sensors:
+            super().start()
+
+    def get_readings(self, now=None):
+        """One SensorReading per configured sensor, in config order."""
+        readings = []
+        with self._buffer_lock:
+            for sensor, buffer in zip(self.sensors, self._buffers):
+                values = tuple(buffer.values())
+                last = buffer.last()
+                readings.append(SensorReading(
+                    name=sensor.get('name', sensor['topic']),
+                    unit=sensor.get('unit', ''),
+                    value=last[1] if last else None,
+                    updated=last[0] if last else None,
+                    minimum=min(values) if values else None,
+                    maximum=max(values) if values else None,
+                    trend=buffer.trend(sensor.get('trend_seconds', DEFAULT_TREND_SECONDS),
+                                       sensor.get('trend_threshold', 0.0)),
+                    values=values,
+                    config=sensor,
+                ))
+        return readings
@@ -1,5 +1,7 @@
 from datetime import datetime
 
 class SystemInfoProvider:
-    def get_info(self):
-        return  "LastUpdated: " + str(datetime.now())
+    def get_info(self, now=None):
+        # `now` is the frame clock; drop the offset to keep the familiar format
+        now = now.replace(tzinfo=None) if now is not None else datetime.now()
+        return  "LastUpdated: " + str(now)
@@ -0,0 +1,58 @@
+"""
+WMO weather interpretation codes (as sent by Open-Meteo) grouped into the
+conditions the dashboard draws an icon for.
+
+Lookups go through a 100-entry table indexed by code, so mapping a whole
+forecast is one index per day instead of a chain of range checks.
+"""
+from typing import Iterable, Optional, Tuple
+
+UNKNOWN = "unknown"
+
+# Icon order in the atlas (weather_icons.py); append new conditions at the end
+CONDITIONS = ("clear", "mostly_clear", "partly_cloudy", "overcast", "fog", "drizzle", "rain",
+              "snow", "showers", "snow_showers", "thunderstorm", UNKNOWN)
+
+_CODE_RANGES = (
+    ((0,), "clear"),
+    ((1,), "mostly_clear"),
+    ((2,), "partly_cloudy"),
+    ((3,), "overcast"),
+    ((45, 48), "fog"),
+    (range(51, 58), "drizzle"), # includes freezing drizzle (56, 57)
+    (range(61, 68), "rain"), # includes freezing rain (66, 67)
+    (range(71, 78), "snow"), # includes snow grains (77)
+    (range(80, 83), "showers"),
+    ((85, 86), "snow_showers"),
+    ((95, 96, 99), "thunderstorm"), # 96, 99: with hail
+)
+
+CONDITION_BY_CODE: Tuple[str, ...] = tuple(
+    next((condition for codes, condition in _CODE_RANGES if code in codes), UNKNOWN) for code in range(100))
+
+EMOJI = {
+    "clear": "☀️",
+    "mostly_clear": "🌤️",
+    "partly_cloudy": "⛅",
+    "overcast": "☁️",
+    "fog": "🌫️",
+    "drizzle": "🌦️",
+    "rain": "🌧️",
+    "snow": "❄️",
+    "showers": "🌦️",
+    "snow_showers": "🌨️",
+    "thunderstorm": "⛈️",
+    UNKNOWN: "?",
+}
+
+
+def condition(code: Optional[int]) -> str:
+    if code is None or not 0 <= code < len(CONDITION_BY_CODE):
+        return UNKNOWN
+    return CONDITION_BY_CODE[code]
+
+
+def conditions(codes: Iterable[int]) -> Tuple[str, ...]:
+    """Condition per code, e.g. for the daily `weathercode` array of a forecast."""
+    table, size = CONDITION_BY_CODE, len(CONDITION_BY_CODE)
+    return tuple(table[code] if 0 <= code < size else UNKNOWN for code in codes)
@@ -0,0 +1,31 @@
+"""
+The weather a frame shows, as one immutable value. Kept apart from the MQTT
+provider so the dummy provider can build one without paho installed.
+"""
+from typing import NamedTuple, Optional
+
+from .weather_codes import EMOJI, condition
+
+
+class WeatherState(NamedTuple):
+    temperature: Optional[float] = None # None until the first message
+    weather_code: Optional[int] = None # WMO code of the current weather; None until the first message
+    highs: tuple = (0, 0, 0, 0, 0)
+    lows: tuple = (0, 0, 0, 0, 0)
+    codes: tuple = () # WMO code per forecast day
+
+    def icon(self) -> str:
+        """Emoji of the current weather."""
+        return EMOJI[condition(self.weather_code)]
+
+    def temperature_text(self) -> str:
+        return "N/A°C" if self.temperature is None else f"{self.temperature}°C"
+
+    def to_list(self) -> list:
+        """JSON-able form for the last good cache, see from_list()."""
+        return [self.temperature, self.weather_code, list(self.highs), list(self.lows), list(self.codes)]
+
+    @classmethod
+    def from_list(cls, value) -> "WeatherState":
+        temperature, weather_code, highs, lows, codes = value
+        return cls(temperature, weather_code, tuple(highs), tuple(lows), tuple(codes))
@@ -0,0 +1,286 @@
+"""
+Offline-first provider access: every guarded provider call runs with a timeout
+behind a circuit breaker, and its last good result is kept on disk. When a call
+fails, times out or the breaker is open, the widget gets the cached result and
+a "stale since" time instead of an exception or a blocked render.
+"""
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from frame_encoder import write_atomically
+from metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+PROVIDER_CALL_SECONDS = REGISTRY.histogram(
+    "dashboard_provider_call_seconds", "Duration of guarded provider reads, including timed out ones",
+    ["provider", "method"])
+PROVIDER_ERRORS = REGISTRY.counter(
+    "dashboard_provider_errors_total", "Guarded provider reads that failed, timed out or were refused by an open circuit",
+    ["provider", "reason"])
+PROVIDER_FALLBACKS = REGISTRY.counter(
+    "dashboard_provider_fallbacks_total", "Reads answered from the last good cache or the placeholder provider",
+    ["provider", "source"])
+PROVIDER_CIRCUIT_OPEN = REGISTRY.gauge(
+    "dashboard_provider_circuit_open", "1 while the provider's circuit breaker refuses reads", ["provider"])
+
+
+class ProviderUnavailable(RuntimeError):
+    """A guarded call failed and there was nothing cached to fall back to."""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After `failure_threshold` consecutive failures it
+    opens and calls are refused for `reset_timeout` seconds; then one trial
+    call is let through (half-open), which closes or re-opens it.
+    """
+    def __init__(self, failure_threshold=3, reset_timeout=300.0, time_fn=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.time_fn = time_fn
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.time_fn() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            # a failed half-open trial re-opens for another full timeout
+            self.opened_at = self.time_fn()
+
+
+class FrameBudget:
+    """
+    Wall-clock allowance for the provider reads of one frame. Once it is spent
+    every read still gets `grace` seconds, so reads that answer right away
+    aren't replaced by cached data because another provider hung.
+    """
+    def __init__(self, seconds, grace=0.05, time_fn=time.monotonic):
+        self.time_fn = time_fn
+        self.grace = grace
+        self.deadline = time_fn() + seconds
+
+    def remaining(self):
+        return max(self.grace, self.deadline - self.time_fn())
+
+
+class LastGoodCache:
+    """
+    {key: [value, unix time]} of the last good provider results, kept in memory
+    and written to `path` (atomically) by flush(). An empty path keeps it in
+    memory only. To spare SD cards, a flush only writes when a value changed or
+    `flush_interval` seconds after the previous write.
+    """
+    def __init__(self, path="", flush_interval=600.0, time_fn=time.time):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.time_fn = time_fn
+        self._entries = {}
+        self._changed = False
+        self._touched = False
+        self._written_at = time_fn()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("Ignoring unreadable cache %s: %s", path, e)
+
+    def get(self, key):
+        """(value, saved_at) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return tuple(entry) if entry else None
+
+    def put(self, key, value):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != value:
+                self._changed = True
+            self._entries[key] = [value, self.time_fn()]
+            self._touched = True
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            due = self._touched and self.time_fn() - self._written_at >= self.flush_interval
+            if not (self._changed or due):
+                return
+            data = json.dumps(self._entries, ensure_ascii=False).encode()
+            self._changed = self._touched = False
+            self._written_at = self.time_fn()
+        try:
+            write_atomically(self.path, data)
+        except OSError as e:
+            log.warning("Could not write cache %s: %s", self.path, e)
+
+
+class DaemonWorker:
+    """
+    Runs submitted calls one at a time on a daemon thread. Unlike a
+    ThreadPoolExecutor, whose workers are joined at interpreter exit, a call
+    that hangs after its caller timed out doesn't keep the process alive.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class GuardedProvider:
+    """
+    Wraps a provider so the methods named in `methods` run on a worker thread
+    with a timeout, behind a circuit breaker, and fall back to their last good
+    result. `methods` maps a method name to an (encode, decode) pair that turns
+    its result into JSON-able data for the cache and back, or to None when the
+    result is JSON-able as it is. Methods named in `uncached` only get the
+    timeout and the breaker; their failures raise ProviderUnavailable. Other
+    attributes are passed through.
+
+    Without a cached result, `fallback` (an object with the same methods, e.g.
+    a DummyProvider) answers instead.
+
+    The provider may define has_data() (False: nothing real yet, answer from
+    the cache or the fallback) and stale_since() (unix time its live data stopped updating).
+    """
+    def __init__(self, provider, name, methods, cache, timeout=5.0, breaker=None,
+                 fallback=None, uncached=()):
+        self._provider = provider
+        self.name = name
+        self._methods = methods
+        self._uncached = frozenset(uncached)
+        self._cache = cache
+        self._fallback_provider = fallback
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = None # FrameBudget of the frame being rendered, if any
+        self._executor = DaemonWorker(f"provider-{name}")
+        self._stale = {} # method -> unix time its result was last good, 0 if never
+        self.failures = 0
+        self.timeouts = 0
+
+    def __getattr__(self, attr):
+        value = getattr(self._provider, attr)
+        if not callable(value) or (attr not in self._methods and attr not in self._uncached):
+            return value
+        return lambda *args, **kwargs: self._call(attr, value, args, kwargs)
+
+    def stale_since(self):
+        """
+        None while every result served is live; otherwise the oldest last-good
+        time among the stale ones (0: no good result was ever seen).
+        """
+        return min(self._stale.values()) if self._stale else None
+
+    def _timeout(self):
+        if self.budget is None:
+            return self.timeout
+        return min(self.timeout, self.budget.remaining())
+
+    def _call(self, method, fn, args, kwargs):
+        key = f"{self.name}.{method}"
+        error, reason = "circuit open", "circuit_open"
+        allowed = self.breaker.allow()
+        PROVIDER_CIRCUIT_OPEN.labels(self.name).set(0 if allowed else 1)
+        if allowed:
+            started = time.perf_counter()
+            try:
+                value = self._executor.submit(fn, *args, **kwargs).result(self._timeout())
+            except FutureTimeout:
+                self.timeouts += 1
+                self.breaker.record_failure()
+                error, reason = "timed out", "timeout"
+            except Exception as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                error, reason = f"failed: {e}", "error"
+            else:
+                self.breaker.record_success()
+                if method in self._uncached:
+                    return value
+                return self._fresh(method, key, value, args, kwargs)
+            finally:
+                PROVIDER_CALL_SECONDS.labels(self.name, method).observe(time.perf_counter() - started)
+        PROVIDER_ERRORS.labels(self.name, reason).inc()
+        log.warning("%s %s", key, error)
+        if method in self._uncached:
+            raise ProviderUnavailable(f"{key} {error}")
+        return self._fallback(method, key, args, kwargs)
+
+    def _fresh(self, method, key, value, args, kwargs):
+        has_data = getattr(self._provider, "has_data", None)
+        if has_data is not None and not has_data():
+            # e.g. MQTT before the first message: the provider's initial state is
+            # a placeholder, not a reading; serve the cache or the fallback, marked stale
+            if self._cache.get(key) is None and self._fallback_provider is None:
+                self._stale[method] = 0
+                return value
+            return self._fallback(method, key, args, kwargs)
+
+        codec = self._methods[method]
+        self._cache.put(key, codec[0](value) if codec else value)
+        live_stale_since = getattr(self._provider, "stale_since", None)
+        since = live_stale_since() if live_stale_since is not None else None
+        if since is None:
+            self._stale.pop(method, None)
+        else:
+            self._stale[method] = since
+        return value
+
+    def _fallback(self, method, key, args, kwargs):
+        cached = self._cache.get(key)
+        if cached is not None:
+            PROVIDER_FALLBACKS.labels(self.name, "cache").inc()
+            self._stale[method] = cached[1]
+            return self._decode(method, cached[0])
+        if self._fallback_provider is None:
+            raise ProviderUnavailable(f"{key} is unavailable and has no cached result")
+        PROVIDER_FALLBACKS.labels(self.name, "placeholder").inc()
+        self._stale[method] = 0
+        return getattr(self._fallback_provider, method)(*args, **kwargs)
+
+    def _decode(self, method, value):
+        codec = self._methods[method]
+        return codec[1](value) if codec else value
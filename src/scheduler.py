@@ -0,0 +1,140 @@
+import logging
+import math
+import time
+
+from metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+FRAMES = REGISTRY.counter("dashboard_frames_total",
+                          "Frames by outcome: rendered, skipped (boundary no longer reachable) or "
+                          "late (finished after its boundary, not written)", ["outcome"])
+RENDER_ESTIMATE = REGISTRY.gauge("dashboard_render_estimate_seconds",
+                                 "Smoothed render duration the scheduler starts frames ahead by")
+
+
+class Ewma:
+    """
+    Exponentially weighted moving average of recent samples.
+    """
+    def __init__(self, alpha, initial):
+        self.alpha = alpha
+        self.value = initial
+
+    def update(self, sample):
+        self.value = self.alpha * sample + (1 - self.alpha) * self.value
+        return self.value
+
+
+class PeriodicTask:
+    """
+    A provider refresh that runs on its own cadence between two renders.
+    """
+    def __init__(self, name, interval, fn, next_due=0.0):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.next_due = next_due
+
+    def run_if_due(self, now):
+        if now < self.next_due:
+            return False
+        try:
+            self.fn()
+        except Exception as e:
+            log.error("Error refreshing %s: %s", self.name, e)
+        # schedule from the slot, not from the (late) run time, so cadences don't drift;
+        # slots missed entirely (or a first run) restart the cadence from now instead
+        self.next_due += self.interval
+        if self.next_due <= now:
+            self.next_due = now + self.interval
+        return True
+
+
+class RenderScheduler:
+    """
+    Renders one frame per period so that it is written just before the period
+    boundary it shows (for the clock: the next full minute).
+
+    The render is started `estimate + safety_margin` seconds before the
+    boundary, where `estimate` is an EWMA of the measured render durations.
+    If a frame can no longer make its deadline it is skipped rather than shown
+    late, and `render` drops a frame that still overruns it. Providers pushed
+    over MQTT update in the background and are simply read at render time;
+    pull providers register a PeriodicTask, which runs right after a frame so
+    it never eats into the next render's budget.
+    Between frames the loop sleeps once, until the next start time.
+
+    `render(deadline)` receives the boundary as a Unix timestamp and must
+    return once the frame has been written, or dropped for finishing after it.
+    """
+    def __init__(self, render, period=60.0, safety_margin=0.5, initial_estimate=3.0, alpha=0.3,
+                 time_fn=time.time, sleep_fn=time.sleep):
+        self.render = render
+        self.period = period
+        self.safety_margin = safety_margin
+        self.estimate = Ewma(alpha, initial_estimate)
+        self.time_fn = time_fn
+        self.sleep_fn = sleep_fn
+        self.tasks = []
+        self.last_deadline = None
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.deadlines_missed = 0
+
+    def add_periodic(self, name, interval, fn, run_first=False):
+        next_due = 0.0 if run_first else self.time_fn() + interval
+        self.tasks.append(PeriodicTask(name, interval, fn, next_due))
+
+    def next_deadline(self, now):
+        """
+        The first period boundary that can still be met from `now`.
+        """
+        deadline = (math.floor(now / self.period) + 1) * self.period
+        if self.last_deadline is not None:
+            deadline = max(deadline, self.last_deadline + self.period)
+        while now + self.estimate.value > deadline:
+            deadline += self.period
+        return deadline
+
+    def start_time(self, deadline):
+        return deadline - self.estimate.value - self.safety_margin
+
+    def run_once(self):
+        """
+        Wait for, render and account one frame; returns the deadline it targeted.
+        """
+        now = self.time_fn()
+        deadline = self.next_deadline(now)
+        if self.last_deadline is not None:
+            # boundaries passed over because they could no longer be met
+            skipped = round((deadline - self.last_deadline) / self.period) - 1
+            self.frames_skipped += skipped
+            if skipped:
+                FRAMES.labels("skipped").inc(skipped)
+        self.last_deadline = deadline
+
+        start = self.start_time(deadline)
+        while now < start:
+            self.sleep_fn(start - now)
+            now = self.time_fn()
+
+        self.render(deadline)
+        finished = self.time_fn()
+        # clip one-off stalls (e.g. a slow network fetch) so they don't make
+        # the following frames start, and show the next minute, far too early
+        self.estimate.update(min(finished - now, 2 * self.estimate.value))
+        RENDER_ESTIMATE.set(self.estimate.value)
+        self.frames_rendered += 1 # counted in FRAMES by the render itself, which also runs without a scheduler
+        if finished > deadline:
+            self.deadlines_missed += 1
+            FRAMES.labels("late").inc()
+            log.warning("Frame for %.0f finished %.2fs late and was dropped", deadline, finished - deadline)
+
+        for task in self.tasks:
+            task.run_if_due(finished)
+        return deadline
+
+    def run(self, max_frames=None):
+        while max_frames is None or self.frames_rendered < max_frames:
+            self.run_once()
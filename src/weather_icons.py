@@ -0,0 +1,216 @@
+"""
+Weather icons drawn as 1-bit vector shapes for e-ink panels, instead of colour
+emoji that get thresholded into mush.
+
+Every condition of providers/weather_codes.py is drawn once per pixel size into
+an atlas (one row of square cells), converted to a 1-bit image and saved as a
+PNG in WEATHER_ICON_CACHE_DIR. Later processes load the sheet, and a frame only
+blits cells out of it.
+"""
+from PySide6.QtGui import QBrush, QColor, QFont, QImage, QPainter, QPainterPath, QPen, QPolygonF, qRgb, qRgba
+from PySide6.QtCore import QPointF, QRectF, Qt
+import logging
+import math
+import os
+
+from providers.weather_codes import CONDITIONS, condition
+
+log = logging.getLogger(__name__)
+
+# Where rendered sheets are kept across runs; "" keeps them in memory only
+WEATHER_ICON_CACHE_DIR = os.getenv("WEATHER_ICON_CACHE_DIR", "icon_cache")
+# Bump when the drawings change, so cached sheets are redrawn
+ATLAS_VERSION = 1
+
+STROKE = 0.06 # line width, in icon widths
+MONO_TABLE = [qRgb(255, 255, 255), qRgb(0, 0, 0)] # index 0 background, 1 ink
+
+
+def _cloud(x, y, w):
+    """Outline of a cloud `w` wide whose flat base starts at (x, y)."""
+    h = w * 0.55
+    path = QPainterPath()
+    path.setFillRule(Qt.WindingFill) # so simplified() unites the overlapping parts
+    path.addRoundedRect(QRectF(x, y - h * 0.45, w, h * 0.45), h * 0.22, h * 0.22)
+    path.addEllipse(QRectF(x + w * 0.12, y - h * 0.8, w * 0.42, w * 0.42))
+    path.addEllipse(QRectF(x + w * 0.38, y - h * 1.0, w * 0.5, w * 0.5))
+    return path.simplified()
+
+
+def _draw_sun(painter, cx, cy, r, rays=True):
+    painter.drawEllipse(QPointF(cx, cy), r, r)
+    if rays:
+        for i in range(8):
+            a = i * math.pi / 4
+            painter.drawLine(QPointF(cx + math.cos(a) * r * 1.45, cy + math.sin(a) * r * 1.45),
+                             QPointF(cx + math.cos(a) * r * 1.95, cy + math.sin(a) * r * 1.95))
+
+
+def _draw_cloud(painter, x, y, w):
+    painter.drawPath(_cloud(x, y, w))
+
+
+def _draw_drops(painter, count, top, length, left=0.3, right=0.75):
+    for i in range(count):
+        x = left + (right - left) * (i / (count - 1) if count > 1 else 0.5)
+        painter.drawLine(QPointF(x, top), QPointF(x - length * 0.35, top + length))
+
+
+def _draw_flakes(painter, count, top, r=0.06, left=0.3, right=0.75):
+    for i in range(count):
+        cx = left + (right - left) * (i / (count - 1) if count > 1 else 0.5)
+        cy = top + r + (r * 1.2 if i % 2 else 0)
+        for k in range(3):
+            a = k * math.pi / 3
+            painter.drawLine(QPointF(cx - math.cos(a) * r, cy - math.sin(a) * r),
+                             QPointF(cx + math.cos(a) * r, cy + math.sin(a) * r))
+
+
+def _draw_bolt(painter, x, y, h):
+    painter.save()
+    painter.setBrush(painter.pen().color())
+    painter.drawPolygon(QPolygonF([QPointF(x + 0.08, y), QPointF(x - 0.04, y + h * 0.55), QPointF(x + 0.04, y + h * 0.55),
+                                   QPointF(x - 0.04, y + h), QPointF(x + 0.14, y + h * 0.4),
+                                   QPointF(x + 0.05, y + h * 0.4), QPointF(x + 0.14, y)]))
+    painter.restore()
+
+
+def draw_icon(painter, name):
+    """Draws condition `name` into the unit square (0, 0)-(1, 1) of `painter`'s coordinates."""
+    if name == "clear":
+        _draw_sun(painter, 0.5, 0.5, 0.2)
+    elif name == "mostly_clear":
+        _draw_sun(painter, 0.45, 0.42, 0.18)
+        _draw_cloud(painter, 0.45, 0.88, 0.48)
+    elif name == "partly_cloudy":
+        _draw_sun(painter, 0.36, 0.34, 0.15)
+        _draw_cloud(painter, 0.18, 0.82, 0.72)
+    elif name == "overcast":
+        _draw_cloud(painter, 0.3, 0.52, 0.6)
+        _draw_cloud(painter, 0.08, 0.8, 0.72)
+    elif name == "fog":
+        _draw_cloud(painter, 0.14, 0.5, 0.72)
+        for i, (left, right) in enumerate(((0.12, 0.82), (0.2, 0.9), (0.12, 0.7))):
+            painter.drawLine(QPointF(left, 0.64 + i * 0.12), QPointF(right, 0.64 + i * 0.12))
+    elif name in ("drizzle", "rain", "showers", "snow", "snow_showers", "thunderstorm"):
+        if name in ("showers", "snow_showers"):
+            _draw_sun(painter, 0.32, 0.26, 0.12)
+        _draw_cloud(painter, 0.14, 0.6, 0.72)
+        if name == "drizzle":
+            _draw_drops(painter, 3, 0.72, 0.12)
+        elif name in ("rain", "showers"):
+            _draw_drops(painter, 4, 0.7, 0.22)
+        elif name in ("snow", "snow_showers"):
+            _draw_flakes(painter, 3, 0.7)
+        else:
+            _draw_bolt(painter, 0.46, 0.62, 0.34)
+    else:
+        font = QFont()
+        font.setBold(True)
+        font.setPixelSize(100)
+        path = QPainterPath()
+        path.addText(0, 0, font, "?")
+        box = path.boundingRect()
+        scale = 0.7 / box.height()
+        painter.save()
+        painter.translate(0.5 - box.center().x() * scale, 0.5 - box.center().y() * scale)
+        painter.scale(scale, scale)
+        painter.fillPath(path, painter.pen().color())
+        painter.restore()
+
+
+def render_sheet(size):
+    """One row of `size` pixel cells, one per condition, as a 1-bit image."""
+    image = QImage(size * len(CONDITIONS), size, QImage.Format_Grayscale8)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    # no antialiasing: every pixel is ink or paper, so the 1-bit conversion is exact
+    pen = QPen(QColor("black"), STROKE)
+    pen.setCapStyle(Qt.RoundCap)
+    pen.setJoinStyle(Qt.RoundJoin)
+    for i, name in enumerate(CONDITIONS):
+        painter.save()
+        painter.translate(i * size, 0)
+        painter.setClipRect(QRectF(0, 0, size, size))
+        painter.scale(size, size)
+        painter.setPen(pen)
+        painter.setBrush(QBrush(Qt.white))
+        draw_icon(painter, name)
+        painter.restore()
+    painter.end()
+    return image.convertToFormat(QImage.Format_Mono, MONO_TABLE, Qt.ThresholdDither)
+
+
+class IconAtlas:
+    """
+    Icon sheets per pixel size, rendered on first use and cached in memory and
+    in `cache_dir`; `draw` blits one cell in the requested ink colour.
+    """
+    def __init__(self, cache_dir=WEATHER_ICON_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._sheets = {} # size -> 1-bit sheet
+        self._tinted = {} # (size, rgba) -> sheet with paper transparent and ink in that colour
+        self.rendered = 0
+
+    def _path(self, size):
+        return os.path.join(self.cache_dir, f"weather-icons-v{ATLAS_VERSION}-{size}.png")
+
+    def sheet(self, size):
+        sheet = self._sheets.get(size)
+        if sheet is not None:
+            return sheet
+        path = self._path(size) if self.cache_dir else None
+        if path and os.path.exists(path):
+            loaded = QImage(path)
+            if (loaded.width(), loaded.height()) == (size * len(CONDITIONS), size):
+                sheet = loaded.convertToFormat(QImage.Format_Mono, MONO_TABLE, Qt.ThresholdDither)
+        if sheet is None:
+            sheet = render_sheet(size)
+            self.rendered += 1
+            if path:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    if not sheet.save(path, "PNG"):
+                        raise OSError("QImage.save failed")
+                except OSError as e:
+                    log.warning("Could not cache weather icons in %s: %s", path, e)
+        self._sheets[size] = sheet
+        return sheet
+
+    def _tinted_sheet(self, size, color):
+        key = (size, color.rgba())
+        tinted = self._tinted.get(key)
+        if tinted is None:
+            tinted = self.sheet(size).copy()
+            tinted.setColorTable([qRgba(0, 0, 0, 0), color.rgba()])
+            self._tinted[key] = tinted
+        return tinted
+
+    def draw(self, painter, rect, code, color="black"):
+        """Draws the icon for WMO `code` (None: unknown), see draw_condition()."""
+        self.draw_condition(painter, rect, condition(code), color)
+
+    def draw_condition(self, painter, rect, name, color="black"):
+        """
+        Draws the icon of condition `name` as large as fits, centered in `rect`.
+        The cell is picked in device pixels, so a scaled output still gets a
+        1:1 blit rather than a resampled small icon.
+        """
+        transform = painter.worldTransform()
+        device_scale = math.sqrt(abs(transform.determinant())) or 1.0
+        side = min(rect.width(), rect.height())
+        size = max(1, round(side * device_scale))
+        index = CONDITIONS.index(name)
+        target = QRectF(rect.center().x() - side / 2, rect.center().y() - side / 2, side, side)
+        painter.drawImage(target, self._tinted_sheet(size, QColor(color)), QRectF(index * size, 0, size, size))
+
+
+_atlas = None
+
+
+def get_atlas():
+    """The process-wide atlas, so sheets are shared by every frame and output."""
+    global _atlas
+    if _atlas is None:
+        _atlas = IconAtlas()
+    return _atlas
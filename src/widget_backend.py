@@ -0,0 +1,497 @@
+"""
+QWidget render backend: builds the dashboard as a hidden widget tree (QLabel,
+QChartView, QCalendarWidget, QTextEdit) and grabs it into an image. Imported
+only when RENDER_BACKEND=widgets, so the painter backend never loads
+QtWidgets or QtCharts.
+"""
+from PySide6.QtWidgets import QWidget, QLabel, QTextEdit, QCalendarWidget, QApplication, QFrame
+from PySide6.QtGui import QFont, QFontMetricsF, QPainter, QPen, QTextCharFormat, QColor, QBrush
+from PySide6.QtCore import Qt, QCoreApplication, QEvent, QPoint, QPointF, QRectF
+from PySide6.QtCharts import QChart, QChartView, QSplineSeries, QValueAxis, QDateTimeAxis
+import time
+
+from dashboard_config import (get_config_value, get_layout_size, get_qt_alignment, get_qt_pen_style, resolve_geometry,
+                              OutputTarget, TIMEZONE_STR)
+from dashboard_providers import DashboardProviders, PROVIDERS_WAITING_TIME
+from frame_clock import FrameClock
+from frame_encoder import RENDER_PHASE_SECONDS
+from painter_backend import (FORECAST_ICON_SIZE, FORECAST_ICON_SPACING, STALE_BADGE_ELEMENTS, allocate_frame,
+                             apply_output_transform, forecast_icons_height, paint_sensor, paint_stale_badge,
+                             stale_badge_rect, stale_badge_text, weather_icon_uses_atlas)
+from providers.agenda_index import AgendaIndex
+from providers.weather_codes import conditions
+from weather_icons import get_atlas
+
+
+def layout_rect(geometry):
+    """Widget geometry in layout pixels; relative geometry resolves against the layout size."""
+    return [round(v) for v in resolve_geometry(geometry, get_layout_size())]
+
+
+# Helper to map string names to Qt.ScrollBarPolicy values
+def get_qt_scrollbar_policy(policy_str):
+    """Converts string scrollbar policy to Qt.ScrollBarPolicy."""
+    policy_map = {
+        "ScrollBarAsNeeded": Qt.ScrollBarAsNeeded,
+        "ScrollBarAlwaysOff": Qt.ScrollBarAlwaysOff,
+        "ScrollBarAlwaysOn": Qt.ScrollBarAlwaysOn
+    }
+    return policy_map.get(policy_str, Qt.ScrollBarAsNeeded)
+
+# Helper to map string names to QFrame.Shape values
+def get_qt_frame_shape(shape_str):
+    """Converts string frame shape to QFrame.Shape."""
+    shape_map = {
+        "NoFrame": QFrame.NoFrame, "Box": QFrame.Box, "Panel": QFrame.Panel,
+        "StyledPanel": QFrame.StyledPanel, "HLine": QFrame.HLine, "VLine": QFrame.VLine,
+        "WinPanel": QFrame.WinPanel
+    }
+    return shape_map.get(shape_str, QFrame.NoFrame)
+
+
+class EInkCalendar(QCalendarWidget):
+    def __init__(self, parent=None, config=None, clock=None):
+        super().__init__(parent)
+        self.config = config or get_config_value(['eink_calendar'])
+        self.setup_calendar_style()
+        self.agenda = AgendaIndex([])
+        # "Today" comes from the frame clock, not the system local date
+        self.today = (clock or FrameClock.capture(TIMEZONE_STR)).qt_today
+        self.setSelectedDate(self.today)
+
+    def set_agenda(self, agenda):
+        self.agenda = agenda
+        self.updateCells() # Refresh cells to show new events
+
+    def setup_calendar_style(self):
+        cfg = self.config
+        self.setGridVisible(cfg.get('grid_visible', False))
+        if cfg.get('vertical_header_format_none', True):
+            self.setVerticalHeaderFormat(QCalendarWidget.NoVerticalHeader)
+        self.setNavigationBarVisible(cfg.get('navigation_bar_visible', False))
+        self.setLocale(self.locale()) # Keep current locale
+
+        style_sheet = f"background-color: {cfg.get('background_color', 'white')}; color: {cfg.get('text_color', 'black')};"
+        self.setStyleSheet(style_sheet)
+
+        font = QFont()
+        font.setPointSize(cfg.get('font_size', 12))
+        font.setBold(cfg.get('font_bold', True))
+        self.setFont(font)
+
+        header_fmt = QTextCharFormat()
+        header_font = QFont()
+        header_font.setBold(cfg.get('header_font_bold', True))
+        header_font.setPointSize(cfg.get('header_font_size', 13))
+        header_fmt.setFont(header_font)
+        self.setHeaderTextFormat(header_fmt)
+
+    def paintCell(self, painter, rect, date):
+        cfg = self.config
+        painter.save() # Save painter state
+
+        # Default cell painting (background, etc.)
+        # super().paintCell(painter, rect, date) # Calling super() first can overpaint custom background
+        
+        # Custom background based on date type
+        if date == self.today:
+            painter.fillRect(rect, QColor(cfg.get('current_date_fill_color', 'black')))
+            painter.setPen(QColor(cfg.get('current_date_text_color', 'white')))
+        else:
+            # For other dates, ensure the background is painted according to stylesheet if not drawing event indicators
+            # If super().paintCell is not called, we might need to manually fill the background
+            painter.fillRect(rect, QColor(cfg.get('background_color', 'white'))) # Ensure background
+            painter.setPen(QColor(cfg.get('text_color', 'black')))
+
+
+        # Draw event indicator if date is in event_list and not the current date (current date has its own style)
+        if self.agenda.has_events(date.toPython()) and date != self.today:
+            pen = QPen(QColor(cfg.get('event_indicator_line_color', 'black')), 
+                       cfg.get('event_indicator_line_width', 2))
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            # Draw a simple underline as event indicator
+            y = rect.bottom() - (cfg.get('event_indicator_line_width', 2) + 2) # Position above bottom edge
+            painter.drawLine(rect.left() + 4, y, rect.right() - 4, y)
+            
+            # Reset pen for drawing text if it was changed for event indicator
+            painter.setPen(QColor(cfg.get('text_color', 'black')))
+
+
+        # Draw the day number
+        painter.setFont(self.font()) # Use the calendar's main font for day numbers
+        painter.drawText(rect, Qt.AlignCenter, str(date.day()))
+        
+        painter.restore() # Restore painter state
+
+class SensorWidget(QWidget):
+    """One configured sensor; painted by the same code as the painter backend."""
+    def __init__(self, reading, text_color, parent=None):
+        super().__init__(parent)
+        self.reading = reading
+        self.text_color = text_color
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        paint_sensor(painter, QRectF(self.rect()), self.reading, self.text_color)
+        painter.end()
+
+
+class WeatherIconWidget(QWidget):
+    """Current conditions icon, blitted from the 1-bit icon atlas."""
+    def __init__(self, code, color, parent=None):
+        super().__init__(parent)
+        self.code = code
+        self.color = color
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        get_atlas().draw(painter, QRectF(self.rect()), self.code, self.color)
+        painter.end()
+
+
+class ForecastIconStrip(QWidget):
+    """
+    Per-day icons under the chart's day labels. Covers the chart view and asks
+    the chart where each day is, so the icons follow the axis layout.
+    """
+    def __init__(self, chart_view, series, start_dt, codes, cfg, label_font, color, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.chart_view = chart_view
+        self.series = series
+        self.start_dt = start_dt
+        self.conditions = conditions(codes)
+        self.cfg = cfg
+        self.label_height = QFontMetricsF(label_font).height()
+        self.color = color
+
+    def paintEvent(self, event):
+        chart = self.chart_view.chart()
+        size = self.cfg.get('size', FORECAST_ICON_SIZE)
+        top = chart.plotArea().bottom() + self.label_height + self.cfg.get('spacing', FORECAST_ICON_SPACING)
+        painter = QPainter(self)
+        for i, name in enumerate(self.conditions):
+            x = chart.mapToPosition(QPointF(self.start_dt.addDays(i).toMSecsSinceEpoch(), 0), self.series).x()
+            pos = self.chart_view.mapFromScene(QPointF(x, top))
+            get_atlas().draw_condition(painter, QRectF(pos.x() - size / 2, pos.y(), size, size), name, self.color)
+        painter.end()
+
+
+class StaleBadge(QWidget):
+    """'stale since' marker over an element whose provider served cached data."""
+    def __init__(self, text, text_color, background_color, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.text_color = text_color
+        self.background_color = background_color
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        paint_stale_badge(painter, QRectF(self.rect()).adjusted(0, 0, -1, -1), self.text,
+                          self.text_color, self.background_color)
+        painter.end()
+
+
+class EInkDashboard(QWidget):
+    def __init__(self, providers=None, clock=None):
+        super().__init__()
+        self.setAttribute(Qt.WA_StaticContents, True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        
+        global_cfg = get_config_value(['global_settings'])
+        self.setStyleSheet(f"background-color: {global_cfg.get('default_background_color', 'white')}; color: {global_cfg.get('default_text_color', 'black')};")
+        self.setWindowTitle("Dashboard")
+        self.setFixedSize(global_cfg.get('main_window_width', 800), global_cfg.get('main_window_height', 480))
+
+        # Initialize providers, unless long-lived ones are handed in
+        if providers is None:
+            providers = DashboardProviders()
+            providers.start()
+            time.sleep(PROVIDERS_WAITING_TIME)
+        self.weather_provider = providers.weather_provider
+        self.home_status_provider = providers.home_status_provider
+        self.system_info_provider = providers.system_info_provider
+        self.event_list_provider = providers.event_list_provider
+        self.notes_provider = providers.notes_provider
+        self.sensor_provider = providers.sensor_provider
+        self.providers = providers
+
+        # One instant for the whole frame, taken after the providers had time to settle
+        self.clock = clock or FrameClock.capture(TIMEZONE_STR)
+        self.init_ui()
+
+    def init_ui(self):
+        """Initializes all UI components by calling their respective methods."""
+        # one weather snapshot for the icon, temperature and chart
+        self.weather = self.weather_provider.get_weather_state()
+        self.init_weather_ui()
+        self.init_clock_ui()
+        self.init_status_ui()
+        self.init_chart_ui()
+        self.init_calendar_ui()
+        self.init_notes_ui()
+        self.init_sysinfo_ui()
+        self.init_sensors_ui()
+        self.init_stale_ui()
+
+    def _setup_label(self, label_instance, config_path_prefix):
+        """Helper to configure a QLabel based on config."""
+        cfg = get_config_value(['dashboard_elements', config_path_prefix])
+        if not cfg: return # Config not found for this element
+
+        font = QFont()
+        font.setPointSize(cfg.get('font_size', 12))
+        font.setBold(cfg.get('font_bold', False))
+        label_instance.setFont(font)
+        
+        geom = cfg.get('geometry', [0,0,100,30])
+        label_instance.setGeometry(*layout_rect(geom))
+
+        alignment = get_qt_alignment(cfg.get('alignment_h'), cfg.get('alignment_v'))
+        label_instance.setAlignment(alignment)
+        
+        if 'text_color' in cfg:
+            label_instance.setStyleSheet(f"color: {cfg['text_color']};")
+        # Add more properties like background color if needed
+
+    def init_weather_ui(self):
+        icon_text = self.weather.icon()
+        temp = self.weather.temperature_text()
+        sunrise, sunset = self.weather_provider.get_sun_times()
+
+        cfg = get_config_value(['dashboard_elements', 'weather_icon'], {})
+        if not weather_icon_uses_atlas(cfg):
+            self.weather_icon = QLabel(icon_text, self)
+            self._setup_label(self.weather_icon, 'weather_icon')
+        else:
+            color = cfg.get('text_color', get_config_value(['global_settings', 'default_text_color'], 'black'))
+            self.weather_icon = WeatherIconWidget(self.weather.weather_code, color, self)
+            self.weather_icon.setGeometry(*layout_rect(cfg.get('icon_geometry', cfg.get('geometry', [0, 0, 100, 30]))))
+        
+        info_text = f"{temp}"
+        self.sun_info = QLabel(info_text, self)
+        self._setup_label(self.sun_info, 'sun_info')
+
+
+    def init_clock_ui(self):
+        cfg_clock = get_config_value(['dashboard_elements', 'clock_label'])
+        cfg_date = get_config_value(['dashboard_elements', 'date_label'])
+        
+        current_dt = self.clock.qt_now
+
+        self.clock_label = QLabel(current_dt.toString(cfg_clock.get('time_format', "HH:mm")), self)
+        self._setup_label(self.clock_label, 'clock_label')
+
+        self.date_label = QLabel(current_dt.toString(cfg_date.get('date_format', "dddd dd/MM")), self)
+        self._setup_label(self.date_label, 'date_label')
+
+
+    def init_status_ui(self):
+        status_text = self.home_status_provider.get_status()
+        self.home_status = QLabel(status_text, self)
+        self._setup_label(self.home_status, 'home_status')
+
+    def init_chart_ui(self):
+        cfg = get_config_value(['dashboard_elements', 'chart_view'])
+        if not cfg: return
+
+        chart = QChart()
+        chart.legend().hide()
+        # Set chart background to transparent or a specific color from config
+        chart.setBackgroundBrush(QBrush(Qt.transparent)) # Or QColor(cfg.get('background_color', 'white'))
+
+        highs, lows = self.weather.highs, self.weather.lows
+        start_dt = self.clock.qt_now
+
+        # High series
+        cfg_high_pen = cfg.get('high_series_pen', {})
+        high_series = QSplineSeries()
+        pen_high = QPen(QColor(cfg_high_pen.get('color', 'black')), 
+                        cfg_high_pen.get('width', 4))
+        pen_high.setStyle(get_qt_pen_style(cfg_high_pen.get('style', 'SolidLine')))
+        high_series.setPen(pen_high)
+        for i, val in enumerate(highs):
+            dt = start_dt.addDays(i)
+            high_series.append(dt.toMSecsSinceEpoch(), val)
+        
+        # Low series
+        cfg_low_pen = cfg.get('low_series_pen', {})
+        low_series = QSplineSeries()
+        pen_low = QPen(QColor(cfg_low_pen.get('color', 'black')), 
+                       cfg_low_pen.get('width', 2))
+        pen_low.setStyle(get_qt_pen_style(cfg_low_pen.get('style', 'DashLine')))
+        low_series.setPen(pen_low)
+        for i, val in enumerate(lows):
+            dt = start_dt.addDays(i)
+            low_series.append(dt.toMSecsSinceEpoch(), val)
+
+        chart.addSeries(high_series)
+        chart.addSeries(low_series)
+
+        # Axis X
+        cfg_axis_x = cfg.get('axisX', {})
+        axis_font_x = QFont()
+        axis_font_x.setPointSize(cfg_axis_x.get('labels_font_size', 12))
+        axis_font_x.setBold(cfg_axis_x.get('labels_font_bold', True))
+        
+        axisX = QDateTimeAxis()
+        axisX.setFormat(cfg_axis_x.get('format', "ddd"))
+        axisX.setTickCount(cfg_axis_x.get('tick_count', 5))
+        axisX.setGridLineVisible(cfg_axis_x.get('grid_line_visible', False))
+        axisX.setLabelsFont(axis_font_x)
+        if 'labels_color' in cfg_axis_x: axisX.setLabelsColor(QColor(cfg_axis_x['labels_color']))
+
+
+        # Axis Y
+        cfg_axis_y = cfg.get('axisY', {})
+        axis_font_y = QFont()
+        axis_font_y.setPointSize(cfg_axis_y.get('labels_font_size', 12))
+        axis_font_y.setBold(cfg_axis_y.get('labels_font_bold', True))
+
+        axisY = QValueAxis()
+        axisY.setRange(cfg_axis_y.get('range_min', -10), cfg_axis_y.get('range_max', 40))
+        axisY.setLabelFormat(cfg_axis_y.get('label_format', "%d'C"))
+        axisY.setGridLineVisible(cfg_axis_y.get('grid_line_visible', False))
+        axisY.setLabelsFont(axis_font_y)
+        if 'labels_color' in cfg_axis_y: axisY.setLabelsColor(QColor(cfg_axis_y['labels_color']))
+
+
+        chart.addAxis(axisX, Qt.AlignBottom)
+        chart.addAxis(axisY, Qt.AlignLeft)
+        high_series.attachAxis(axisX); high_series.attachAxis(axisY)
+        low_series.attachAxis(axisX); low_series.attachAxis(axisY)
+        
+        self.chart_view = QChartView(chart, self)
+        if cfg.get('antialiasing', False):
+            self.chart_view.setRenderHint(QPainter.Antialiasing)
+        else: # Ensure it's explicitly off if false
+            self.chart_view.setRenderHint(QPainter.Antialiasing, False)
+
+        geom_chart = cfg.get('geometry', [-20, 195, 500, 285])
+        self.chart_view.setGeometry(*layout_rect(geom_chart))
+        # Make chart view background transparent to see main window background
+        self.chart_view.setStyleSheet("background: transparent;")
+
+        daily_codes = self.weather.codes
+        icons_height = forecast_icons_height(cfg, daily_codes)
+        if icons_height:
+            margins = chart.margins()
+            margins.setBottom(margins.bottom() + icons_height)
+            chart.setMargins(margins)
+            color = cfg['forecast_icons'].get('color', get_config_value(['global_settings', 'default_text_color'], 'black'))
+            self.forecast_icons = ForecastIconStrip(self.chart_view, high_series, start_dt,
+                                                    daily_codes[:max(len(highs), len(lows))], cfg['forecast_icons'],
+                                                    axis_font_x, color, self)
+            self.forecast_icons.setGeometry(self.chart_view.geometry())
+
+
+    def init_calendar_ui(self):
+        cfg = get_config_value(['dashboard_elements', 'calendar_widget_instance'])
+        calendar_config = get_config_value(['eink_calendar']) # Pass specific calendar config
+
+        self.calendar = EInkCalendar(self, config=calendar_config, clock=self.clock)
+        geom_cal = cfg.get('geometry', [450, 205, 350, 280])
+        self.calendar.setGeometry(*layout_rect(geom_cal))
+        
+        # Same per-day index the notes panel reads, so both views agree on dates
+        self.calendar.set_agenda(self.event_list_provider.get_agenda(self.clock.now))
+
+    def init_notes_ui(self):
+        cfg = get_config_value(['dashboard_elements', 'notes_text_edit'])
+        if not cfg: return
+
+        notes_text = self.notes_provider.get_notes_markdown(self.clock.now)
+        self.notes = QTextEdit(self)
+        
+        notes_font = QFont()
+        notes_font.setPointSize(cfg.get('font_size', 10))
+        notes_font.setBold(cfg.get('font_bold', False))
+        self.notes.setFont(notes_font)
+        
+        self.notes.setReadOnly(True)
+        self.notes.setVerticalScrollBarPolicy(get_qt_scrollbar_policy(cfg.get('vertical_scrollbar_policy', 'ScrollBarAlwaysOff')))
+        self.notes.setHorizontalScrollBarPolicy(get_qt_scrollbar_policy(cfg.get('horizontal_scrollbar_policy', 'ScrollBarAlwaysOff')))
+        self.notes.setFrameShape(get_qt_frame_shape(cfg.get('frame_shape', 'NoFrame')))
+        
+        # For QTextEdit, colors are often better handled by stylesheet for consistency
+        text_color = cfg.get('text_color', get_config_value(['global_settings', 'default_text_color'], 'black'))
+        bg_color = cfg.get('background_color', 'transparent') # Default to transparent
+        self.notes.setStyleSheet(f"QTextEdit {{ color: {text_color}; background-color: {bg_color}; border: none; }}")
+
+        self.notes.setMarkdown(notes_text)
+        geom_notes = cfg.get('geometry', [550, 5, 240, 190])
+        self.notes.setGeometry(*layout_rect(geom_notes))
+
+    def init_sysinfo_ui(self):
+        info = self.system_info_provider.get_info(self.clock.now)
+        self.sysinfo_label = QLabel(info, self)
+        self._setup_label(self.sysinfo_label, 'sysinfo_label')
+
+    def init_sensors_ui(self):
+        text_color = get_config_value(['global_settings', 'default_text_color'], 'black')
+        self.sensor_widgets = []
+        for reading in self.sensor_provider.get_readings(self.clock.now):
+            widget = SensorWidget(reading, reading.config.get('text_color', text_color), self)
+            widget.setGeometry(*layout_rect(reading.config.get('geometry', [0, 0, 200, 40])))
+            self.sensor_widgets.append(widget)
+
+    def init_stale_ui(self):
+        """Badges over the elements whose providers served stale data; reads the providers' state after init_ui."""
+        global_cfg = get_config_value(['global_settings'])
+        self.stale_badges = []
+        for name, since in self.providers.stale().items():
+            element = get_config_value(['dashboard_elements', STALE_BADGE_ELEMENTS[name]])
+            if not element: continue
+            text = stale_badge_text(since, self.clock)
+            badge = StaleBadge(text, global_cfg.get('default_text_color', 'black'),
+                               global_cfg.get('default_background_color', 'white'), self)
+            badge.setGeometry(stale_badge_rect(element, text, get_layout_size()).toAlignedRect())
+            self.stale_badges.append(badge)
+
+
+def render_widget_outputs(providers, clock, outputs):
+    """
+    Builds the dashboard widget tree once for the frame and renders it into one
+    image per output target. Widgets have a fixed geometry, so every output gets
+    the layout-size tree scaled uniformly and centered.
+    """
+    started = time.perf_counter()
+    window = EInkDashboard(providers, clock)
+    # The following lines are for rendering to an image, typical for e-ink displays
+    # If you want to show the window on screen for testing, comment out WA_DontShowOnScreen and the rendering part
+    window.setAttribute(Qt.WA_DontShowOnScreen, True) # Don't show on screen, render to pixmap
+    window.show() # Required for layout and rendering to occur properly
+
+    QApplication.processEvents() # Ensure UI is fully constructed and laid out
+    built = time.perf_counter()
+    RENDER_PHASE_SECONDS.labels("build").observe(built - started)
+
+    background = QColor(get_config_value(['global_settings', 'default_background_color'], 'white'))
+    images = []
+    for output in outputs:
+        image = allocate_frame(output)
+        image.fill(background) # Fill with configured background
+        painter = QPainter(image)
+        try:
+            apply_output_transform(painter, output, get_layout_size(), letterbox=True)
+            # Render the window contents through the painter, so scaling stays vector
+            # Using QWidget.render() is the correct way to capture its appearance
+            window.render(painter, QPoint())
+        finally:
+            painter.end()
+        images.append(image)
+
+    RENDER_PHASE_SECONDS.labels("paint").observe(time.perf_counter() - built)
+
+    # Widgets are rebuilt per frame; release this one before the next frame.
+    # Without an event loop deleteLater() alone never runs, so flush it here
+    window.close()
+    window.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    return images
+
+
+def render_widgets(providers, clock):
+    """Builds the dashboard widget tree for one frame and renders it to an image of the layout size."""
+    return render_widget_outputs(providers, clock, [OutputTarget("", *get_layout_size())])[0]
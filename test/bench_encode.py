@@ -0,0 +1,42 @@
+"""
+Benchmark the output encoders on a rendered frame.
+
+Run from the repository root: python test/bench_encode.py [image]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtGui import QGuiApplication, QImage
+
+from frame_encoder import convert_color_mode, encode_image, load_qoi
+
+CASES = [
+    ("png", "argb", -1), ("png", "argb", 1), ("png", "grayscale", 6), ("png", "palette", 6),
+    ("png", "mono", 6), ("webp", "grayscale", -1), ("qoi", "grayscale", -1), ("raw", "mono", -1),
+]
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    app = QGuiApplication(sys.argv)
+    image = QImage(sys.argv[1] if len(sys.argv) > 1 else "dashboard.png").convertToFormat(QImage.Format_RGB32)
+    for fmt, mode, level in CASES:
+        if fmt == "qoi" and load_qoi() is None:
+            print(f"{fmt:>5} {mode:>9}: skipped, 'qoi' package not installed")
+            continue
+        convert, converted = best_of(lambda: convert_color_mode(image, mode))
+        encode, data = best_of(lambda: encode_image(converted, fmt, level))
+        print(f"{fmt:>5} {mode:>9} level {level:>2}: convert {convert * 1000:6.2f} ms, "
+              f"encode {encode * 1000:6.2f} ms, {len(data):>8} bytes")
@@ -0,0 +1,66 @@
+"""
+Peak RSS of rendering and saving frames from the recorded provider data,
+default profile vs MEMORY_PROFILE=low. Every profile runs in a fresh process.
+
+Run from the repository root:
+    python test/bench_memory.py [--frames 20]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def child(frames):
+    sys.path.insert(0, HERE)
+    import conftest # headless Qt, config and src/ on sys.path
+    from dashboard_config import LOW_MEMORY
+    if LOW_MEMORY:
+        from PySide6.QtGui import QGuiApplication
+        app = QGuiApplication([])
+    else:
+        from PySide6.QtWidgets import QApplication
+        app = QApplication([])
+
+    import render_app
+    from frame_clock import FrameClock
+    from frame_encoder import FrameWriter
+    from memory_budget import current_rss_mb, peak_rss_mb
+    from dashboard_config import get_outputs
+    from painter_backend import allocate_frame
+    from test_golden import FROZEN_NOW, recorded_providers
+
+    providers = recorded_providers()
+    writer = FrameWriter()
+    outputs = get_outputs(os.path.join(tempfile.mkdtemp(), "dashboard.png"))
+    frame_buffers = {output.file: allocate_frame(output) for output in outputs} if LOW_MEMORY else None
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+        render_app.render_frame(providers, clock, writer, outputs, frame_buffers=frame_buffers).result()
+    elapsed = time.perf_counter() - t0
+    writer.close()
+    qt_modules = sorted(m.split('.')[-1] for m in sys.modules if m.startswith("PySide6.Qt"))
+    print(f"{render_app.RENDER_BACKEND:<8} {current_rss_mb():7.1f} MB now {peak_rss_mb():7.1f} MB peak "
+          f"{elapsed / frames * 1000:7.1f} ms/frame  {', '.join(qt_modules)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.frames)
+        sys.exit(0)
+
+    for profile, backend in (("default", "widgets"), ("default", "painter"), ("low", "painter")):
+        env = dict(os.environ, MEMORY_PROFILE=profile, RENDER_BACKEND=backend)
+        result = subprocess.run([sys.executable, __file__, "--child", "--frames", str(args.frames)],
+                                env=env, capture_output=True, text=True)
+        lines = [line for line in result.stdout.splitlines() if " MB peak " in line]
+        print(f"{profile:<8} {lines[-1] if lines else result.stderr.strip().splitlines()[-1]}")
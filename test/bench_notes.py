@@ -0,0 +1,74 @@
+"""
+Benchmark notes generation on large synthetic calendars.
+
+Run from the repository root: python test/bench_notes.py [sizes...]
+"""
+import os
+import sys
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from providers.agenda_index import AgendaIndex
+from providers.notes_provider import NotesProvider
+
+
+class StaticEventsProvider:
+    def __init__(self, events, timezone_name="Europe/Amsterdam"):
+        self._events = events
+        self.timezone_name = timezone_name
+        self._agenda = None
+
+    def get_events(self, now=None):
+        return self._events
+
+    def get_agenda(self, now=None):
+        # built once per snapshot, like EventsProvider.get_agenda()
+        if self._agenda is None:
+            self._agenda = AgendaIndex.from_events(self._events, self.timezone_name)
+        return self._agenda
+
+
+def make_events(count, seed=42):
+    rnd = random.Random(seed)
+    base = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=15)
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=rnd.randrange(0, 60 * 24 * 45))
+        if rnd.random() < 0.2:
+            day = start.date()
+            events.append({
+                "summary": f"All day {i}",
+                "start": {"date": day.isoformat()},
+                "end": {"date": (day + timedelta(days=rnd.randint(1, 3))).isoformat()},
+            })
+        else:
+            end = start + timedelta(minutes=rnd.choice((30, 60, 90, 60 * 26)))
+            events.append({
+                "summary": f"Event {i}",
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": end.isoformat()},
+            })
+    return events
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        events = make_events(size)
+        build = best_of(lambda: AgendaIndex.from_events(events, "Europe/Amsterdam"))
+        notes = NotesProvider(StaticEventsProvider(events))
+        elapsed = best_of(notes.get_notes_markdown)
+        print(f"{size:>7} events: agenda build {build * 1000:8.2f} ms, "
+              f"get_notes_markdown {elapsed * 1000:8.2f} ms")
@@ -0,0 +1,90 @@
+"""
+Load-test the providers offline against the local stand-ins.
+
+Run from the repository root:
+    python test/bench_providers.py calendar --calendars 100 --events 50 --latency 0.05
+    python test/bench_providers.py mqtt --rate 10000 --seconds 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from standins.calendar_api import FakeCalendarApi, synthetic_calendars
+from standins.mqtt_broker import LocalMqttBroker
+
+
+def bench_calendar(args):
+    from providers import events_provider
+
+    now = datetime.now(timezone.utc)
+    api = FakeCalendarApi(synthetic_calendars(args.calendars, args.events, month=now.date()),
+                          latency=args.latency, jitter=args.jitter, page_size=args.page_size).start()
+    events_provider.API_ENDPOINT = api.endpoint
+    try:
+        provider = events_provider.EventsProvider("Europe/Amsterdam")
+        t0 = time.perf_counter()
+        events = provider.refresh(now)
+        fetch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        provider.get_agenda(now)
+        index = time.perf_counter() - t0
+    finally:
+        api.stop()
+    print(f"{args.calendars} calendars, {len(events)} events, {api.requests} requests: "
+          f"refresh {fetch:.2f} s, agenda {index * 1000:.1f} ms")
+
+
+def bench_mqtt(args):
+    from providers import weather_provider
+
+    with open(os.path.join(HERE, "fixtures", "weather_messages.json")) as f:
+        recorded = json.load(f)
+
+    broker = LocalMqttBroker().start()
+    weather_provider.BROKER, weather_provider.PORT = "127.0.0.1", broker.port
+    provider = weather_provider.WeatherProvider()
+    received = [0]
+    on_message = provider._on_message
+    def counting_on_message(client, userdata, msg):
+        received[0] += 1
+        on_message(client, userdata, msg)
+    provider.client.on_message = counting_on_message
+
+    provider.start()
+    broker.wait_for_subscription()
+    messages = (recorded * (args.rate * args.seconds // len(recorded) + 1))[:args.rate * args.seconds]
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    sent, dropped = broker.replay(messages, rate=args.rate, drop_rate=args.drop_rate, seed=1)
+    # give the client a moment to drain its socket
+    deadline = time.monotonic() + 5
+    while received[0] < sent and time.monotonic() < deadline:
+        time.sleep(0.05)
+    elapsed, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    provider.stop()
+    broker.stop()
+    print(f"sent {sent} (dropped {dropped}) in {elapsed:.2f} s: received {received[0]} "
+          f"({received[0] / elapsed:.0f} msg/s), process CPU {cpu:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="target", required=True)
+    cal = sub.add_parser("calendar")
+    cal.add_argument("--calendars", type=int, default=100)
+    cal.add_argument("--events", type=int, default=50)
+    cal.add_argument("--latency", type=float, default=0.05)
+    cal.add_argument("--jitter", type=float, default=0.0)
+    cal.add_argument("--page-size", type=int, default=250)
+    mqtt = sub.add_parser("mqtt")
+    mqtt.add_argument("--rate", type=int, default=10000)
+    mqtt.add_argument("--seconds", type=int, default=5)
+    mqtt.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    {"calendar": bench_calendar, "mqtt": bench_mqtt}[args.target](args)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Headless, deterministic environment for everything imported from src/
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("UI_CONFIG_FILE", os.path.join(ROOT, "ui_config.json"))
+os.environ.setdefault("PROVIDERS_WAITING_TIME", "0")
+os.environ.setdefault("MAX_ITEM_LIST_IN_NOTES", "5")
+os.environ.setdefault("LAST_GOOD_CACHE_FILE", "") # keep last good results in memory only
+os.environ.setdefault("INTERACTIVE_AUTH", "0")
+os.environ.setdefault("WEATHER_ICON_CACHE_DIR", "") # render icon sheets in memory only
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import pytest
+
+# (case, backend, milliseconds) collected by the render tests
+RENDER_TIMINGS = []
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtWidgets import QApplication
+    # QApplication serves both backends; the painter one only needs its QGuiApplication part
+    return QApplication.instance() or QApplication([])
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RENDER_TIMINGS:
+        return
+    terminalreporter.section("render times")
+    for case, backend, ms in RENDER_TIMINGS:
+        terminalreporter.write_line(f"{case:<12} {backend:<8} {ms:8.2f} ms")
@@ -0,0 +1 @@
+"""Local stand-ins for the MQTT broker and the Google Calendar API."""
@@ -0,0 +1,169 @@
+"""
+Local HTTP stand-in for the subset of the Google Calendar v3 API that
+EventsProvider uses: calendarList.list and events.list, with pagination,
+injected latency and error responses.
+
+Point the provider at it with
+GOOGLE_CALENDAR_API_ENDPOINT=http://127.0.0.1:<port>/calendar/v3/
+"""
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import json
+import random
+import threading
+import time
+
+LIST_PATH = "/calendar/v3/users/me/calendarList"
+EVENTS_PREFIX = "/calendar/v3/calendars/"
+
+
+def _event_start(event):
+    start = event["start"]
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00"))
+    return datetime.fromisoformat(start["date"]).replace(tzinfo=timezone.utc)
+
+
+def _event_end(event):
+    end = event["end"]
+    if "dateTime" in end:
+        return datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00"))
+    return datetime.fromisoformat(end["date"]).replace(tzinfo=timezone.utc)
+
+
+def synthetic_calendars(calendar_count, events_per_calendar, month=None, seed=0):
+    """
+    {calendar_id: {"summary", "events"}} with timed and all-day events spread
+    over `month` (a date in it; default this month).
+    """
+    rnd = random.Random(seed)
+    month = month or date.today()
+    first = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    calendars = {}
+    for c in range(calendar_count):
+        events = []
+        for e in range(events_per_calendar):
+            start = first + timedelta(minutes=rnd.randrange(0, 60 * 24 * 28))
+            if rnd.random() < 0.15:
+                day = start.date()
+                events.append({"id": f"c{c}e{e}", "summary": f"All day {c}/{e}",
+                               "start": {"date": day.isoformat()},
+                               "end": {"date": (day + timedelta(days=rnd.randint(1, 3))).isoformat()}})
+            else:
+                end = start + timedelta(minutes=rnd.choice((15, 30, 60, 120)))
+                events.append({"id": f"c{c}e{e}", "summary": f"Event {c}/{e}",
+                               "start": {"dateTime": start.isoformat()},
+                               "end": {"dateTime": end.isoformat()}})
+        calendars[f"calendar-{c}@example.com"] = {"summary": f"Calendar {c}", "events": events}
+    return calendars
+
+
+class FakeCalendarApi:
+    """
+    Usage:
+        api = FakeCalendarApi(synthetic_calendars(100, 50), latency=0.05).start()
+        os.environ["GOOGLE_CALENDAR_API_ENDPOINT"] = api.endpoint
+        ...
+        api.stop()
+
+    `latency` (+ up to `jitter`) seconds are added to every request and
+    `error_rate` of the requests answer 503. `page_size` caps items per page
+    unless the client asks for fewer with maxResults.
+    """
+    def __init__(self, calendars, latency=0.0, jitter=0.0, error_rate=0.0, page_size=250,
+                 host="127.0.0.1", port=0, seed=None):
+        self.calendars = calendars
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/calendar/v3/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="calendar-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _paginate(self, items, query):
+        page_size = min(int(query.get("maxResults", [self.page_size])[0]), self.page_size)
+        offset = int(query.get("pageToken", ["0"])[0])
+        body = {"items": items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            body["nextPageToken"] = str(offset + page_size)
+        return body
+
+    def calendar_list(self, query):
+        items = [{"kind": "calendar#calendarListEntry", "id": calendar_id, "summary": calendar["summary"],
+                  **({"primary": True} if i == 0 else {})}
+                 for i, (calendar_id, calendar) in enumerate(self.calendars.items())]
+        return {"kind": "calendar#calendarList", **self._paginate(items, query)}
+
+    def events_list(self, calendar_id, query):
+        calendar = self.calendars.get(calendar_id)
+        if calendar is None:
+            return None
+        events = calendar["events"]
+        if "timeMin" in query:
+            time_min = datetime.fromisoformat(query["timeMin"][0].replace("Z", "+00:00"))
+            events = [e for e in events if _event_end(e) > time_min]
+        if "timeMax" in query:
+            time_max = datetime.fromisoformat(query["timeMax"][0].replace("Z", "+00:00"))
+            events = [e for e in events if _event_start(e) < time_max]
+        if query.get("orderBy", [""])[0] == "startTime":
+            events = sorted(events, key=_event_start)
+        return {"kind": "calendar#events", "summary": calendar["summary"], **self._paginate(events, query)}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with api._lock:
+                    api.requests += 1
+                    delay = api.latency + (api._random.uniform(0, api.jitter) if api.jitter else 0)
+                    fail = api.error_rate and api._random.random() < api.error_rate
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    return self._reply(503, {"error": {"code": 503, "message": "Backend Error"}})
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == LIST_PATH:
+                    return self._reply(200, api.calendar_list(query))
+                if url.path.startswith(EVENTS_PREFIX) and url.path.endswith("/events"):
+                    calendar_id = unquote(url.path[len(EVENTS_PREFIX):-len("/events")])
+                    body = api.events_list(calendar_id, query)
+                    if body is not None:
+                        return self._reply(200, body)
+                self._reply(404, {"error": {"code": 404, "message": "Not Found"}})
+
+        return Handler
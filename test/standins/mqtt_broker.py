@@ -0,0 +1,247 @@
+"""
+In-process MQTT 3.1.1 broker for offline tests and load simulation.
+
+Real paho clients (the weather and home status providers) connect to it over
+TCP. It implements what those clients use: CONNECT, SUBSCRIBE/UNSUBSCRIBE with
+'+'/'#' wildcards, PUBLISH at QoS 0-2 in, QoS 0 out, retained messages,
+PINGREQ and DISCONNECT. Recorded topics can be replayed with injected delays,
+jitter, drop rate and a target message rate.
+"""
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 10, 11, 12, 13, 14
+
+
+def topic_matches(topic_filter, topic):
+    filter_levels = topic_filter.split('/')
+    topic_levels = topic.split('/')
+    for i, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if i >= len(topic_levels) or (level != '+' and level != topic_levels[i]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+def encode_length(length):
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(out)
+
+
+def encode_string(value):
+    data = value.encode()
+    return struct.pack("!H", len(data)) + data
+
+
+def packet(packet_type, flags, body=b""):
+    return bytes([packet_type << 4 | flags]) + encode_length(len(body)) + body
+
+
+def publish_packet(topic, payload, retain=False):
+    return packet(PUBLISH, 1 if retain else 0, encode_string(topic) + payload)
+
+
+class _Session(socketserver.BaseRequestHandler):
+    """One client connection; reads packets until the client goes away."""
+    def setup(self):
+        self.broker = self.server.broker
+        self.filters = []
+        self.write_lock = threading.Lock()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, data):
+        with self.write_lock:
+            self.request.sendall(data)
+
+    def _read_exact(self, n):
+        data = bytearray()
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_packet(self):
+        first = self._read_exact(1)[0]
+        length, multiplier = 0, 1
+        while True:
+            byte = self._read_exact(1)[0]
+            length += (byte & 0x7F) * multiplier
+            multiplier *= 128
+            if not byte & 0x80:
+                break
+        return first >> 4, first & 0x0F, self._read_exact(length)
+
+    def handle(self):
+        try:
+            while True:
+                packet_type, flags, body = self._read_packet()
+                if packet_type == CONNECT:
+                    self.send(packet(CONNACK, 0, b"\x00\x00"))
+                    self.broker._register(self)
+                elif packet_type == PUBLISH:
+                    self._on_publish(flags, body)
+                elif packet_type == PUBREL:
+                    self.send(packet(PUBCOMP, 0, body[:2]))
+                elif packet_type == SUBSCRIBE:
+                    self._on_subscribe(body)
+                elif packet_type == UNSUBSCRIBE:
+                    self._on_unsubscribe(body)
+                elif packet_type == PINGREQ:
+                    self.send(packet(PINGRESP, 0))
+                elif packet_type == DISCONNECT:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.broker._unregister(self)
+
+    def _on_publish(self, flags, body):
+        qos, retain = (flags >> 1) & 0x03, bool(flags & 0x01)
+        topic_length = struct.unpack("!H", body[:2])[0]
+        topic = body[2:2 + topic_length].decode()
+        offset = 2 + topic_length
+        if qos:
+            packet_id = body[offset:offset + 2]
+            offset += 2
+            self.send(packet(PUBACK if qos == 1 else PUBREC, 0, packet_id))
+        self.broker.publish(topic, body[offset:], retain)
+
+    def _on_subscribe(self, body):
+        packet_id, offset, new_filters = body[:2], 2, []
+        while offset < len(body):
+            length = struct.unpack("!H", body[offset:offset + 2])[0]
+            new_filters.append(body[offset + 2:offset + 2 + length].decode())
+            offset += 2 + length + 1 # skip the requested QoS, everything is delivered at QoS 0
+        self.filters.extend(new_filters)
+        self.send(packet(SUBACK, 0, packet_id + b"\x00" * len(new_filters)))
+        for topic, payload in self.broker.retained_matching(new_filters):
+            self.send(publish_packet(topic, payload, retain=True))
+        self.broker._subscribed.set()
+
+    def _on_unsubscribe(self, body):
+        packet_id, offset = body[:2], 2
+        while offset < len(body):
+            length = struct.unpack("!H", body[offset:offset + 2])[0]
+            topic_filter = body[offset + 2:offset + 2 + length].decode()
+            if topic_filter in self.filters:
+                self.filters.remove(topic_filter)
+            offset += 2 + length
+        self.send(packet(UNSUBACK, 0, packet_id))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalMqttBroker:
+    """
+    Usage:
+        broker = LocalMqttBroker().start()
+        # point the providers at 127.0.0.1:broker.port
+        broker.replay(messages, delay=0.05, drop_rate=0.1)
+        broker.stop()
+    """
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = _Server((host, port), _Session)
+        self._server.broker = self
+        self._sessions = []
+        self._retained = {}
+        self._lock = threading.Lock()
+        self._subscribed = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.delivered = 0
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mqtt-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            try:
+                session.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._server.server_close()
+
+    def _register(self, session):
+        with self._lock:
+            self._sessions.append(session)
+
+    def _unregister(self, session):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+
+    def wait_for_subscription(self, timeout=5.0):
+        """Blocks until any client has subscribed; returns False on timeout."""
+        return self._subscribed.wait(timeout)
+
+    def retained_matching(self, filters):
+        with self._lock:
+            return [(topic, payload) for topic, payload in self._retained.items()
+                    if any(topic_matches(f, topic) for f in filters)]
+
+    def publish(self, topic, payload, retain=False):
+        """Delivers a message to every matching subscriber at QoS 0."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        data = publish_packet(topic, payload)
+        with self._lock:
+            if retain:
+                self._retained[topic] = payload
+            targets = [s for s in self._sessions if any(topic_matches(f, topic) for f in s.filters)]
+            self.published += 1
+            self.delivered += len(targets)
+        for session in targets:
+            try:
+                session.send(data)
+            except OSError:
+                pass
+
+    def replay(self, messages, delay=0.0, jitter=0.0, drop_rate=0.0, rate=None, retain=False, seed=None):
+        """
+        Publishes recorded messages ({"topic", "payload"[, "delay"]}) in order.
+        `delay`/`jitter` add latency before each message (a per-message "delay"
+        overrides `delay`), `drop_rate` silently loses that share of messages and
+        `rate` caps the throughput in messages per second.
+        Returns (sent, dropped).
+        """
+        rnd = random.Random(seed)
+        sent = dropped = 0
+        started = time.perf_counter()
+        for message in messages:
+            wait = message.get("delay", delay) + (rnd.uniform(0, jitter) if jitter else 0)
+            if wait:
+                time.sleep(wait)
+            if rate:
+                ahead = (sent + dropped) / rate - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+            if drop_rate and rnd.random() < drop_rate:
+                dropped += 1
+                continue
+            self.publish(message["topic"], message["payload"], retain)
+            sent += 1
+        return sent, dropped
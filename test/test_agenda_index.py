@@ -0,0 +1,65 @@
+"""
+Per-day agenda buckets shared by the calendar and the notes (src/providers/agenda_index.py).
+"""
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+TIMEZONE = "Europe/Amsterdam"
+
+
+def index(*events):
+    from providers.agenda_index import AgendaIndex
+    return AgendaIndex.from_events(events, TIMEZONE)
+
+
+def event(summary, start, end):
+    key = "date" if len(start) == 10 else "dateTime"
+    return {"summary": summary, "start": {key: start}, "end": {key: end}}
+
+
+def test_all_day_end_date_is_exclusive():
+    agenda = index(event("Holiday", "2025-05-20", "2025-05-21"))
+    assert agenda.dates() == [date(2025, 5, 20)]
+    assert agenda.day(date(2025, 5, 20)).has_all_day
+
+
+def test_timed_event_ending_at_midnight_stays_on_its_day():
+    agenda = index(event("Month end", "2025-05-31T23:30:00+02:00", "2025-06-01T00:00:00+02:00"))
+    assert agenda.dates() == [date(2025, 5, 31)]
+    assert not agenda.has_events(date(2025, 6, 1))
+
+
+def test_days_are_bucketed_in_the_index_timezone():
+    # 23:30 UTC on the 19th is 01:30 on the 20th in Amsterdam
+    agenda = index(event("Night call", "2025-05-19T23:30:00Z", "2025-05-19T23:45:00Z"),
+                   event("Holiday", "2025-05-19", "2025-05-20"))
+    assert agenda.dates() == [date(2025, 5, 19), date(2025, 5, 20)]
+    night = agenda.day(date(2025, 5, 20))
+    assert night.records[0].summary == "Night call"
+    assert night.first_start == datetime(2025, 5, 20, 1, 30, tzinfo=ZoneInfo(TIMEZONE))
+    assert not night.has_all_day
+    # all-day dates start at local midnight, not UTC midnight
+    assert agenda.day(date(2025, 5, 19)).first_start.utcoffset().total_seconds() == 7200
+
+
+def test_multi_day_events_mark_every_day_they_cover():
+    agenda = index(event("Offsite", "2025-05-20", "2025-05-23"),
+                   event("Late train", "2025-05-21T23:10:00+02:00", "2025-05-22T00:40:00+02:00"))
+    assert agenda.dates() == [date(2025, 5, 20), date(2025, 5, 21), date(2025, 5, 22)]
+    assert [agenda.day(date(2025, 5, d)).count for d in (20, 21, 22)] == [1, 2, 2]
+    # a day reached by a span keeps the span's own start as its earliest
+    assert agenda.day(date(2025, 5, 22)).first_start.day == 20
+
+
+def test_upcoming_and_rows_round_trip():
+    from providers.agenda_index import AgendaIndex
+
+    agenda = index(event("A", "2025-05-20T09:00:00+02:00", "2025-05-20T10:00:00+02:00"),
+                   event("B", "2025-05-18T09:00:00+02:00", "2025-05-18T10:00:00+02:00"),
+                   event("C", "2025-05-21", "2025-05-22"))
+    now = datetime(2025, 5, 19, tzinfo=ZoneInfo(TIMEZONE))
+    assert [rec.summary for rec in agenda.upcoming(now, 5)] == ["A", "C"]
+
+    restored = AgendaIndex.from_rows(agenda.to_rows(), TIMEZONE)
+    assert restored.dates() == agenda.dates()
+    assert [rec.summary for rec in restored.upcoming(now, 1)] == ["A"]
@@ -0,0 +1,89 @@
+"""
+Colour reduction, PNG compression levels and atomic frame writes (src/frame_encoder.py).
+"""
+import os
+import stat
+
+import pytest
+
+
+def test_write_replaces_the_target_atomically(tmp_path):
+    from frame_encoder import write_atomically
+
+    target = tmp_path / "frame.png"
+    target.write_bytes(b"old")
+    write_atomically(str(target), b"new")
+
+    assert target.read_bytes() == b"new"
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o644
+    assert os.listdir(tmp_path) == ["frame.png"]
+
+
+def test_failed_write_keeps_the_target_and_removes_the_temp_file(tmp_path, monkeypatch):
+    from frame_encoder import write_atomically
+
+    target = tmp_path / "frame.png"
+    target.write_bytes(b"old")
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", fail)
+
+    with pytest.raises(OSError):
+        write_atomically(str(target), b"new")
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["frame.png"]
+
+
+@pytest.mark.parametrize("mode,expected", [
+    ("argb", "Format_ARGB32"),
+    ("grayscale", "Format_Grayscale8"),
+    ("palette", "Format_Indexed8"),
+    ("mono", "Format_Mono"),
+])
+def test_color_modes(qapp, mode, expected):
+    from PySide6.QtGui import QImage
+    from frame_encoder import convert_color_mode
+
+    image = QImage(16, 8, QImage.Format_ARGB32)
+    image.fill(0xff808080)
+    converted = convert_color_mode(image, mode, gray_levels=4)
+    assert converted.format() == getattr(QImage, expected)
+    assert converted.size() == image.size()
+    if mode == "palette":
+        assert [c & 0xff for c in converted.colorTable()] == [0, 85, 170, 255]
+
+
+def test_png_quality_maps_back_to_the_zlib_level():
+    from frame_encoder import png_quality
+
+    # Qt's PNG writer uses (100 - quality) * 9 / 91, rounded down, as the zlib level
+    for level in range(10):
+        assert (100 - png_quality(level)) * 9 // 91 == level
+    assert png_quality(-1) == -1
+    assert png_quality(12) == png_quality(9)
+
+
+def test_submit_frames_resolves_false_when_a_write_fails(qapp, tmp_path):
+    from PySide6.QtGui import QImage
+    from frame_encoder import FrameWriter
+
+    image = QImage(8, 8, QImage.Format_ARGB32)
+    image.fill(0xffffffff)
+    writer = FrameWriter(color_mode="mono")
+    try:
+        assert writer.submit_frames([(image, str(tmp_path / "a.png"))]).result() is True
+        assert writer.submit_frames([(image, str(tmp_path / "b.png")),
+                                     (image, str(tmp_path / "missing" / "c.png"))]).result() is False
+    finally:
+        writer.close()
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "b.png"]
+    assert writer.timings["png"]
+
+
+def test_gray_levels_are_checked_at_startup():
+    from frame_encoder import parse_gray_levels
+
+    assert parse_gray_levels("2") == 2 and parse_gray_levels("256") == 256
+    for value in ("1", "0", "257"):
+        with pytest.raises(ValueError):
+            parse_gray_levels(value)
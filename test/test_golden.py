@@ -0,0 +1,120 @@
+"""
+Golden-image regression tests: render the dashboard from recorded provider data
+and a frozen clock, and compare the frame against test/golden/<case>-<backend>.png.
+
+Goldens depend on the installed fonts; regenerate them with
+UPDATE_GOLDEN=1 python -m pytest test/test_golden.py
+"""
+import json
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import RENDER_TIMINGS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+GOLDEN = os.path.join(HERE, "golden")
+UPDATE_GOLDEN = os.getenv("UPDATE_GOLDEN") == "1"
+
+# A pixel matches when no channel differs by more than PIXEL_TOLERANCE;
+# a frame matches when at most MAX_MISMATCH_RATIO of its pixels don't
+PIXEL_TOLERANCE = 48
+MAX_MISMATCH_RATIO = 0.002
+
+FROZEN_NOW = datetime(2025, 5, 19, 8, 30)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
+
+
+def replay(provider, messages):
+    """Feeds recorded MQTT messages through the provider's message callback."""
+    for message in messages:
+        msg = SimpleNamespace(topic=message["topic"], payload=message["payload"].encode())
+        provider._on_message(None, None, msg)
+    return provider
+
+
+def recorded_providers():
+    from dashboard_config import TIMEZONE_STR
+    from dashboard_providers import DashboardProviders, DummyProvider, HomeStatusProvider, WeatherProvider
+    from providers.agenda_index import AgendaIndex
+
+    class FakeEventsProvider(DummyProvider):
+        """Fixed event list instead of the Calendar API."""
+        def __init__(self, events):
+            self.events = events
+            self.agenda = AgendaIndex.from_events(events, TIMEZONE_STR)
+        def get_events(self, now=None): return self.events
+        def get_agenda(self, now=None): return self.agenda
+
+    events = FakeEventsProvider(load_fixture("events.json"))
+    return DashboardProviders(
+        # the real providers, never started: recorded payloads replace the broker
+        weather_provider=replay(WeatherProvider(), load_fixture("weather_messages.json")),
+        home_status_provider=replay(HomeStatusProvider(), load_fixture("home_status_messages.json")),
+        event_list_provider=events,
+    )
+
+
+def dummy_providers():
+    from dashboard_providers import DashboardProviders, DummyProvider
+    dummy = DummyProvider()
+    return DashboardProviders(dummy, dummy, dummy, dummy, dummy)
+
+
+CASES = {
+    "recorded": recorded_providers,
+    "dummy": dummy_providers,
+}
+
+
+def mismatch_ratio(actual, expected, tolerance=PIXEL_TOLERANCE):
+    """Share of pixels whose largest per-channel difference exceeds `tolerance`."""
+    from PySide6.QtGui import QImage
+    if actual.size() != expected.size():
+        return 1.0
+    a = actual.convertToFormat(QImage.Format_RGB32)
+    b = expected.convertToFormat(QImage.Format_RGB32)
+    a_bytes, b_bytes = bytes(a.constBits()), bytes(b.constBits())
+    if a_bytes == b_bytes:
+        return 0.0
+    mismatched = 0
+    for i in range(0, len(a_bytes), 4):
+        if a_bytes[i:i + 4] != b_bytes[i:i + 4] and any(
+                abs(x - y) > tolerance for x, y in zip(a_bytes[i:i + 3], b_bytes[i:i + 3])):
+            mismatched += 1
+    return mismatched / (a.width() * a.height())
+
+
+@pytest.mark.parametrize("backend", ["widgets", "painter"])
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_render_matches_golden(qapp, case, backend, tmp_path):
+    import render_app
+    from frame_clock import FrameClock
+    from PySide6.QtGui import QImage
+
+    providers = CASES[case]()
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+
+    t0 = time.perf_counter()
+    image = render_app.render_image(providers, clock, backend)
+    RENDER_TIMINGS.append((case, backend, (time.perf_counter() - t0) * 1000))
+
+    golden_path = os.path.join(GOLDEN, f"{case}-{backend}.png")
+    if UPDATE_GOLDEN or not os.path.exists(golden_path):
+        os.makedirs(GOLDEN, exist_ok=True)
+        assert image.save(golden_path)
+        pytest.skip(f"golden image written to {golden_path}")
+
+    ratio = mismatch_ratio(image, QImage(golden_path))
+    if ratio > MAX_MISMATCH_RATIO:
+        actual_path = str(tmp_path / f"{case}-{backend}.png")
+        image.save(actual_path)
+        pytest.fail(f"{ratio:.2%} of pixels differ from {golden_path}; actual frame saved to {actual_path}")
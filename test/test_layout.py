@@ -0,0 +1,83 @@
+"""
+Relative/anchored geometry and multi-output rendering from one layout pass.
+"""
+from datetime import datetime
+
+import pytest
+
+from test_golden import mismatch_ratio, recorded_providers
+
+FROZEN_NOW = datetime(2025, 5, 19, 8, 30)
+
+
+@pytest.mark.parametrize("geometry,expected", [
+    ([10, 20, 30, 40], [10, 20, 30, 40]),
+    ({"x": 10, "y": 20, "w": 30, "h": 40}, [10, 20, 30, 40]),
+    ({"anchor": "bottom-right", "x": 10, "y": 20, "w": 30, "h": 40}, [960, 740, 30, 40]),
+    ({"anchor": "top-right", "w": "25%", "h": "50%"}, [750, 0, 250, 400]),
+    ({"anchor": "center", "x": 5, "w": 100, "h": 100}, [455, 350, 100, 100]),
+    ({"anchor": "bottom", "h": 20}, [0, 780, 1000, 20]),
+])
+def test_resolve_geometry(geometry, expected):
+    from dashboard_config import resolve_geometry
+    assert resolve_geometry(geometry, (1000, 800)) == expected
+
+
+def test_outputs_default_to_one_layout_sized_frame():
+    from dashboard_config import OutputTarget, get_outputs
+    assert get_outputs("dashboard.png") == [OutputTarget("dashboard.png", 800, 480, 0)]
+    assert OutputTarget("p.png", 1448, 1072, 90).image_size == (1072, 1448)
+
+
+class CountingProvider:
+    """Forwards to a provider and counts the calls to its get_* reads."""
+    def __init__(self, provider, calls):
+        self._provider = provider
+        self._calls = calls
+    def __getattr__(self, name):
+        attr = getattr(self._provider, name)
+        if not callable(attr) or not name.startswith("get_"):
+            return attr
+        def counted(*args, **kwargs):
+            self._calls[name] = self._calls.get(name, 0) + 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def test_painter_outputs_share_one_read_of_the_providers(qapp):
+    import render_app
+    from dashboard_config import OutputTarget
+    from frame_clock import FrameClock
+    from PySide6.QtGui import QTransform
+
+    calls = {}
+    base = recorded_providers()
+    providers = render_app.DashboardProviders(*(CountingProvider(getattr(base, name), calls) for name in (
+        "weather_provider", "home_status_provider", "system_info_provider", "event_list_provider",
+        "notes_provider", "sensor_provider")))
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    outputs = [OutputTarget("a.png", 800, 480), OutputTarget("b.png", 640, 384),
+               OutputTarget("c.png", 1448, 1072, 90), OutputTarget("d.png", 800, 480, 180)]
+
+    images = render_app.render_images(providers, clock, outputs, backend="painter")
+
+    assert [(i.width(), i.height()) for i in images] == [(800, 480), (640, 384), (1072, 1448), (800, 480)]
+    assert all(count == 1 for count in calls.values()), calls
+    reference = render_app.render_image(base, clock, backend="painter")
+    assert mismatch_ratio(images[0], reference) == 0.0
+    assert mismatch_ratio(images[3].transformed(QTransform().rotate(180)), reference) < 0.02 # hinting differs upside down
+
+
+def test_widget_outputs_are_letterboxed(qapp):
+    import render_app
+    from dashboard_config import OutputTarget
+    from frame_clock import FrameClock
+    from PySide6.QtGui import QColor
+
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    square, = render_app.render_images(recorded_providers(), clock, [OutputTarget("a.png", 800, 800)], backend="widgets")
+
+    assert (square.width(), square.height()) == (800, 800)
+    # 800x480 centered: 160 px borders in the background colour above and below
+    assert all(QColor(square.pixel(x, 10)) == QColor("white") for x in range(0, 800, 20))
+    assert any(QColor(square.pixel(x, 300)).lightness() < 128 for x in range(0, 800))
@@ -0,0 +1,109 @@
+"""
+Low memory profile: RSS budget, raw payload release, frame reuse and the
+lightweight notes Markdown painter.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime, timezone
+
+import pytest
+
+from standins.calendar_api import FakeCalendarApi, synthetic_calendars
+
+
+def test_budget_releases_memory_before_giving_up():
+    from memory_budget import RssBudget, RssBudgetExceeded
+
+    rss = [120.0]
+    def release():
+        rss[0] -= 30
+    budget = RssBudget(100, rss_fn=lambda: rss[0], release_fn=release)
+
+    assert budget.check() == 90.0
+    rss[0] = 200.0
+    with pytest.raises(RssBudgetExceeded):
+        budget.check()
+    assert budget.releases == 2
+
+
+def test_events_provider_can_keep_only_the_agenda(monkeypatch):
+    from providers import events_provider
+
+    now = datetime(2025, 5, 19, 8, 30, tzinfo=timezone.utc)
+    api = FakeCalendarApi(synthetic_calendars(2, 10, month=now.date())).start()
+    try:
+        monkeypatch.setattr(events_provider, "API_ENDPOINT", api.endpoint)
+        provider = events_provider.EventsProvider("Europe/Amsterdam", keep_raw_events=False)
+        agenda = provider.get_agenda(now)
+    finally:
+        api.stop()
+
+    assert len(agenda) == 20
+    assert provider.get_events(now) == []
+    assert all(rec.event is None for rec in agenda.upcoming(datetime(2025, 5, 1, tzinfo=timezone.utc), 20))
+    assert api.requests == 3
+
+
+def test_low_profile_frame_leaves_the_heavy_modules_unloaded():
+    # a fresh process: this one already has QtWidgets for the widgets backend tests
+    script = textwrap.dedent("""
+        import os, sys, tempfile
+        import conftest
+        from PySide6.QtGui import QGuiApplication
+        app = QGuiApplication([])
+
+        import render_app
+        from dashboard_config import get_outputs
+        from frame_clock import FrameClock
+        from frame_encoder import FrameWriter
+        from test_golden import FROZEN_NOW, recorded_providers
+
+        writer = FrameWriter()
+        outputs = get_outputs(os.path.join(tempfile.mkdtemp(), "dashboard.png"))
+        clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+        saved = render_app.render_frame(recorded_providers(), clock, writer, outputs).result()
+        writer.close()
+        print(saved, *sorted(m for m in ("PySide6.QtWidgets", "PySide6.QtCharts", "googleapiclient", "numpy")
+                             if m in sys.modules))
+    """)
+    env = dict(os.environ, MEMORY_PROFILE="low", PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=120)
+    assert result.stdout.split() == ["True"], result.stderr
+
+
+def test_painter_reuses_the_frame_buffer(qapp):
+    import render_app
+    from dashboard_providers import DashboardProviders, DummyProvider
+    from frame_clock import FrameClock
+    from painter_backend import PainterDashboard, allocate_frame
+
+    dummy = DummyProvider()
+    providers = DashboardProviders(dummy, dummy, dummy, dummy, dummy, dummy)
+    clock = FrameClock(render_app.TIMEZONE_STR, datetime(2025, 5, 19, 8, 30))
+    frame = allocate_frame()
+
+    first = PainterDashboard(providers, clock, lite_markdown=True).render(frame)
+    second = PainterDashboard(providers, clock, lite_markdown=True).render(frame)
+    assert first is frame and second is frame
+
+
+def test_lite_markdown_wraps_and_marks_list_items(qapp):
+    from PySide6.QtCore import QRectF
+    from PySide6.QtGui import QColor, QFontMetricsF, QImage, QPainter
+    from painter_backend import make_font, paint_markdown_lite
+
+    markdown = "## Upcoming Events\n\n**Mon 19 May**\n\n-  14:00 Dentist with a rather long title that wraps\n"
+    image = QImage(200, 200, QImage.Format_RGB32)
+    image.fill(QColor("white"))
+    painter = QPainter(image)
+    font = make_font(10, False)
+    narrow = paint_markdown_lite(painter, QRectF(0, 0, 200, 200), markdown, font, "black")
+    wide = paint_markdown_lite(painter, QRectF(0, 0, 2000, 200), markdown, font, "black")
+    painter.end()
+
+    assert narrow > wide # the list item wrapped
+    # the bullet sits in the left column of the list item's line
+    item_top = int(wide - QFontMetricsF(font).height())
+    assert any(QColor(image.pixel(x, y)).lightness() < 128 for x in range(8) for y in range(item_top, int(wide)))
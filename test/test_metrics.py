@@ -0,0 +1,99 @@
+"""
+Prometheus text metrics (src/metrics.py) and structured logs (src/log_config.py).
+"""
+import json
+import logging
+import urllib.request
+
+from test_golden import FROZEN_NOW, recorded_providers
+
+
+def test_exposition_format():
+    from metrics import Registry
+    registry = Registry()
+    frames = registry.counter("frames_total", "Frames", ["outcome"])
+    size = registry.gauge("output_bytes", "Size")
+    latency = registry.histogram("call_seconds", "Calls", ["provider"], buckets=(0.1, 1.0))
+
+    frames.labels("rendered").inc()
+    frames.labels("rendered").inc()
+    size.set(1234)
+    for value in (0.05, 0.5, 5.0):
+        latency.labels('we"ather').observe(value)
+
+    text = registry.exposition()
+    assert "# TYPE frames_total counter\nframes_total{outcome=\"rendered\"} 2\n" in text
+    assert "output_bytes 1234\n" in text
+    assert 'call_seconds_bucket{provider="we\\"ather",le="0.1"} 1\n' in text
+    assert 'call_seconds_bucket{provider="we\\"ather",le="1"} 2\n' in text
+    assert 'call_seconds_bucket{provider="we\\"ather",le="+Inf"} 3\n' in text
+    assert 'call_seconds_sum{provider="we\\"ather"} 5.55\n' in text
+    assert 'call_seconds_count{provider="we\\"ather"} 3\n' in text
+
+
+def test_registry_serves_and_writes(tmp_path):
+    from metrics import Registry
+    registry = Registry()
+    registry.counter("hits_total", "Hits").inc()
+
+    server = registry.serve(0, "127.0.0.1")
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert "hits_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    path = tmp_path / "dashboard.prom"
+    registry.write(str(path))
+    assert path.read_text() == registry.exposition()
+
+
+def test_frame_updates_render_and_provider_metrics(qapp, tmp_path, monkeypatch):
+    import render_app
+    from frame_clock import FrameClock
+    from frame_encoder import FrameWriter
+    from metrics import REGISTRY
+
+    def sample(name, *labels):
+        child = REGISTRY.get(name).labels(*labels)
+        return child.count if hasattr(child, "count") else child.value
+
+    providers = recorded_providers()
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    metrics_file = tmp_path / "dashboard.prom"
+    monkeypatch.setattr(render_app, "METRICS_FILE", str(metrics_file))
+    rendered = sample("dashboard_frames_total", "rendered")
+
+    writer = FrameWriter()
+    try:
+        outputs = render_app.get_outputs(str(tmp_path / "frame.png"))
+        render_app.render_frame(providers, clock, writer, outputs=outputs).result()
+    finally:
+        writer.close()
+
+    assert sample("dashboard_frames_total", "rendered") == rendered + 1
+    assert sample("dashboard_provider_call_seconds", "weather", "get_weather_state") >= 1
+    assert sample("dashboard_provider_stale_seconds", "weather") == 0
+    assert sample("dashboard_output_bytes", outputs[0].file) == (tmp_path / "frame.png").stat().st_size
+    assert 'dashboard_render_phase_seconds_count{phase="encode"}' in metrics_file.read_text()
+
+
+def test_json_log_lines(capsys):
+    from log_config import configure_logging
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    try:
+        configure_logging("INFO", "json")
+        logging.getLogger("render_app").info("Dashboard saved to %s", "dashboard.png")
+        logging.getLogger("render_app").debug("not shown")
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["level"] == "INFO" and entry["logger"] == "render_app"
+    assert entry["message"] == "Dashboard saved to dashboard.png"
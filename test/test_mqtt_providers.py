@@ -0,0 +1,49 @@
+"""
+MQTT ingestion: coalescing on the network thread, validation and snapshots.
+"""
+from types import SimpleNamespace
+
+FORECAST = '{"temperature_2m_max":[%s,19.8],"temperature_2m_min":[9.7,11.9],"weathercode":[2,3]}'
+
+
+def deliver(provider, topic, payload):
+    provider._on_message(None, None, SimpleNamespace(topic=topic, payload=payload.encode()))
+
+
+def test_bursts_are_coalesced_to_the_latest_payload():
+    from providers import weather_provider
+
+    provider = weather_provider.WeatherProvider()
+    for high in range(100):
+        deliver(provider, weather_provider.WEATHER_FORECAST_TOPIC, FORECAST % high)
+
+    assert provider.get_highs_and_lows() == ((99, 19.8), (9.7, 11.9))
+    assert (provider.received, provider.coalesced) == (100, 99)
+
+
+def test_invalid_payloads_keep_the_previous_state():
+    from providers import weather_provider
+
+    provider = weather_provider.WeatherProvider()
+    deliver(provider, weather_provider.CURRENT_WEATHER_TOPIC, '{"temperature":15.6,"weathercode":0}')
+    assert provider.get_current_temperature() == "15.6°C"
+
+    for payload in ('{"temperature":', '{"temperature":"warm","weathercode":0}', '[]'):
+        deliver(provider, weather_provider.CURRENT_WEATHER_TOPIC, payload)
+        assert provider.get_current_temperature() == "15.6°C"
+    deliver(provider, weather_provider.WEATHER_FORECAST_TOPIC, '{"temperature_2m_max":[1,2],"temperature_2m_min":[1]}')
+    assert provider.get_highs_and_lows() == ((0, 0, 0, 0, 0), (0, 0, 0, 0, 0))
+    assert provider.rejected == 4
+
+
+def test_snapshot_is_not_mutated_by_later_messages():
+    from providers import home_status_provider
+
+    provider = home_status_provider.HomeStatusProvider()
+    deliver(provider, home_status_provider.CURRENT_TEMPERATURE_TOPIC, "21.4")
+    before = provider.snapshot()
+    deliver(provider, home_status_provider.CURRENT_TEMPERATURE_TOPIC, "unavailable")
+    deliver(provider, home_status_provider.CURRENT_HUMIDITY_TOPIC, "48")
+
+    assert before.temp == "21.4" and before.humidity == "0"
+    assert provider.get_status() == "LivingRoom: 21.4°C, 48%"
@@ -0,0 +1,52 @@
+"""
+Notes Markdown of the upcoming events (src/providers/notes_provider.py).
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+TIMEZONE = "Europe/Amsterdam"
+NOW = datetime(2025, 5, 19, 8, 30, tzinfo=ZoneInfo(TIMEZONE))
+
+EVENTS = [
+    {"summary": "Dentist", "start": {"dateTime": "2025-05-20T14:00:00+02:00"}, "end": {"dateTime": "2025-05-20T15:00:00+02:00"}},
+    {"summary": "Standup", "start": {"dateTime": "2025-05-20T07:30:00Z"}, "end": {"dateTime": "2025-05-20T07:45:00Z"}},
+    {"summary": "Holiday", "start": {"date": "2025-05-21"}, "end": {"date": "2025-05-22"}},
+    {"summary": "Offsite", "start": {"date": "2025-05-22"}, "end": {"date": "2025-05-25"}},
+    {"summary": "Late train", "start": {"dateTime": "2025-05-22T23:10:00+02:00"}, "end": {"dateTime": "2025-05-23T00:40:00+02:00"}},
+    {"summary": "Yesterday", "start": {"dateTime": "2025-05-18T19:00:00+02:00"}, "end": {"dateTime": "2025-05-18T21:00:00+02:00"}},
+]
+
+
+def notes_for(events, limit=5):
+    from providers import notes_provider
+    from providers.agenda_index import AgendaIndex
+
+    agenda = AgendaIndex.from_events(events, TIMEZONE)
+    provider = notes_provider.NotesProvider(SimpleNamespace(get_agenda=lambda now=None: agenda))
+    return provider.get_notes_markdown(NOW)
+
+
+def test_notes_group_events_per_day(monkeypatch):
+    from providers import notes_provider
+    monkeypatch.setattr(notes_provider, "MAX_ITEM_LIST_IN_NOTES", 5)
+
+    assert notes_for(EVENTS) == (
+        "## Upcoming Events\n"
+        "\n**Tue 20 May**\n\n"
+        "-  09:30 Standup\n"
+        "-  14:00 Dentist\n"
+        "\n**Wed 21 May**\n\n"
+        "-  Holiday\n"  # all-day: no time, and the exclusive end is not a second day
+        "\n**Thu 22 May**\n\n"
+        "-  Offsite → 24 May\n"
+        "-  23:10 Late train → 23 May\n"
+    )
+
+
+def test_notes_are_limited_to_the_first_events(monkeypatch):
+    from providers import notes_provider
+    monkeypatch.setattr(notes_provider, "MAX_ITEM_LIST_IN_NOTES", 2)
+
+    assert notes_for(EVENTS).count("\n-  ") == 2
+    assert notes_for([]) == "## Upcoming Events\n"
@@ -0,0 +1,298 @@
+"""
+Provider timeouts, circuit breakers and last good fallbacks (src/resilience.py).
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from standins.calendar_api import FakeCalendarApi, synthetic_calendars
+from test_golden import FROZEN_NOW, recorded_providers
+
+
+class FakeTime:
+    def __init__(self, now=1000.0):
+        self.now = now
+    def __call__(self):
+        return self.now
+
+
+class FlakyWeather:
+    """Answers until told to fail or hang."""
+    def __init__(self):
+        self.mode = "ok"
+        self.release = threading.Event()
+    def get_current_temperature(self):
+        if self.mode == "fail":
+            raise ConnectionError("network is unreachable")
+        if self.mode == "hang":
+            self.release.wait(10)
+        return "15.6°C"
+
+
+def guarded(provider, cache=None, **kwargs):
+    from resilience import GuardedProvider, LastGoodCache
+    return GuardedProvider(provider, "weather", {"get_current_temperature": None},
+                           cache if cache is not None else LastGoodCache(), **kwargs)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    from resilience import CircuitBreaker
+    clock = FakeTime()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, time_fn=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 60
+    assert breaker.state == "half-open" and breaker.allow()
+    breaker.record_failure() # the trial call fails: open again for a full timeout
+    assert not breaker.allow()
+    clock.now += 60
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failure_serves_last_good_result_marked_stale():
+    weather = FlakyWeather()
+    provider = guarded(weather)
+    assert provider.get_current_temperature() == "15.6°C"
+    assert provider.stale_since() is None
+
+    weather.mode = "fail"
+    assert provider.get_current_temperature() == "15.6°C"
+    assert provider.stale_since() is not None and provider.failures == 1
+
+    weather.mode = "ok"
+    provider.get_current_temperature()
+    assert provider.stale_since() is None
+
+
+def test_timeout_falls_back_within_the_frame_budget():
+    from resilience import FrameBudget
+    weather = FlakyWeather()
+    provider = guarded(weather, timeout=5.0)
+    provider.get_current_temperature()
+
+    weather.mode = "hang"
+    provider.budget = FrameBudget(0.2)
+    started = time.monotonic()
+    try:
+        assert provider.get_current_temperature() == "15.6°C"
+    finally:
+        weather.release.set()
+    assert time.monotonic() - started < 1.0
+    assert provider.timeouts == 1
+
+
+def test_open_circuit_skips_the_provider():
+    from resilience import CircuitBreaker
+    weather = FlakyWeather()
+    provider = guarded(weather, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    provider.get_current_temperature()
+    weather.mode = "fail"
+    provider.get_current_temperature()
+    weather.mode = "hang" # would block, but the open circuit never calls it
+    assert provider.get_current_temperature() == "15.6°C"
+    assert provider.failures == 1 and provider.timeouts == 0
+
+
+def test_no_cached_result_uses_the_fallback():
+    from dashboard_providers import DummyProvider
+    from resilience import ProviderUnavailable
+    weather = FlakyWeather()
+    weather.mode = "fail"
+    with pytest.raises(ProviderUnavailable):
+        guarded(weather).get_current_temperature()
+    provider = guarded(weather, fallback=DummyProvider())
+    assert provider.get_current_temperature() == "N/A°C"
+    assert provider.stale_since() == 0
+
+
+def test_cache_survives_a_restart(tmp_path):
+    from providers.agenda_index import AgendaIndex
+    from resilience import LastGoodCache
+    from test_golden import load_fixture
+
+    path = str(tmp_path / "last_good.json")
+    agenda = AgendaIndex.from_events(load_fixture("events.json"), "Europe/Amsterdam")
+    cache = LastGoodCache(path)
+    cache.put("events.get_agenda", agenda.to_rows())
+    cache.flush()
+
+    value, saved_at = LastGoodCache(path).get("events.get_agenda")
+    restored = AgendaIndex.from_rows(value, "Europe/Amsterdam")
+    assert restored.dates() == agenda.dates()
+    assert [r[:4] for r in restored.upcoming(datetime(2025, 5, 1, tzinfo=timezone.utc), 50)] == \
+           [r[:4] for r in agenda.upcoming(datetime(2025, 5, 1, tzinfo=timezone.utc), 50)]
+
+
+def test_non_interactive_mode_never_starts_oauth(monkeypatch, tmp_path):
+    from providers import events_provider
+    monkeypatch.setattr(events_provider, "API_ENDPOINT", None)
+    monkeypatch.setattr(events_provider, "INTERACTIVE_AUTH", "0")
+    monkeypatch.setattr(events_provider, "SECRET_FOLDER", str(tmp_path) + "/")
+    with pytest.raises(events_provider.AuthorizationRequired):
+        events_provider.get_calendar_service()
+
+
+def test_failed_refresh_keeps_the_old_agenda_marked_stale(monkeypatch):
+    from dashboard_providers import DashboardProviders, DummyProvider
+    from providers import events_provider
+
+    now = datetime(2025, 5, 19, 8, 30, tzinfo=timezone.utc)
+    api = FakeCalendarApi(synthetic_calendars(2, 5, month=now.date())).start()
+    try:
+        monkeypatch.setattr(events_provider, "API_ENDPOINT", api.endpoint)
+        providers = DashboardProviders(DummyProvider(), DummyProvider(), DummyProvider(),
+                                       event_list_provider=events_provider.EventsProvider("UTC"))
+        agenda = providers.event_list_provider.get_agenda(now)
+        assert len(agenda) == 10 and providers.stale() == {}
+
+        api.error_rate = 1.0
+        with pytest.raises(Exception):
+            providers.event_list_provider.refresh(now)
+        assert len(providers.event_list_provider.get_agenda(now)) == 10
+        assert set(providers.stale()) == {"events", "notes"}
+    finally:
+        api.stop()
+
+
+def test_hanging_provider_still_renders_in_time(qapp, monkeypatch):
+    import render_app
+    from frame_clock import FrameClock
+
+    providers = recorded_providers()
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    render_app.render_images(providers, clock, [render_app.get_outputs("a.png")[0]], backend="painter")
+
+    release = threading.Event()
+    def hang(*args, **kwargs):
+        release.wait(10)
+    monkeypatch.setattr(providers.weather_provider._provider, "get_weather_state", hang)
+    providers.begin_frame(0.3)
+    started = time.monotonic()
+    try:
+        image, = render_app.render_images(providers, clock, [render_app.get_outputs("a.png")[0]], backend="painter")
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2.0
+    assert not image.isNull()
+    assert set(providers.stale()) == {"weather"}
+
+
+def test_hanging_call_does_not_hold_up_exit():
+    from conftest import ROOT
+
+    # a read that hangs well past its timeout, in a process that is done after it
+    script = textwrap.dedent("""
+        import threading
+        from resilience import GuardedProvider, LastGoodCache
+
+        class Hung:
+            def get_current_temperature(self):
+                threading.Event().wait(30)
+
+        class Fallback:
+            def get_current_temperature(self):
+                return "N/A°C"
+
+        provider = GuardedProvider(Hung(), "weather", {"get_current_temperature": None}, LastGoodCache(),
+                                   timeout=0.2, fallback=Fallback())
+        print(provider.get_current_temperature())
+    """)
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=30)
+    assert result.stdout.strip() == "N/A°C", result.stderr
+    assert time.monotonic() - started < 5
+
+
+def test_never_connected_provider_is_a_stale_placeholder():
+    from dashboard_providers import DashboardProviders, DummyProvider
+    from providers.home_status_provider import HomeStatusProvider
+    from providers.weather_provider import WeatherProvider
+    from resilience import LastGoodCache
+
+    # MQTT providers that never received a message, and nothing cached
+    providers = DashboardProviders(WeatherProvider(), HomeStatusProvider(), event_list_provider=DummyProvider(),
+                                   notes_provider=DummyProvider(), cache=LastGoodCache())
+    assert providers.weather_provider.get_current_temperature() == "N/A°C"
+    assert providers.weather_provider.get_weather_code() is None
+    assert providers.home_status_provider.get_status() == "Home status: N/A"
+    assert providers.stale() == {"weather": 0, "home_status": 0}
+
+    # once something was cached, that is shown instead, stale since it was saved
+    providers.cache.put("home_status.get_status", "LivingRoom: 21.4°C, 48%")
+    assert providers.home_status_provider.get_status() == "LivingRoom: 21.4°C, 48%"
+    assert providers.stale()["home_status"] > 0
+
+
+def test_rejected_payloads_are_not_data():
+    from dashboard_providers import DashboardProviders, DummyProvider
+    from providers import home_status_provider
+    from providers.weather_provider import WeatherProvider
+    from resilience import LastGoodCache
+    from test_mqtt_providers import deliver
+
+    # e.g. a retained "unavailable" is the only message the broker has
+    home_status = home_status_provider.HomeStatusProvider()
+    deliver(home_status, home_status_provider.CURRENT_TEMPERATURE_TOPIC, "unavailable")
+    providers = DashboardProviders(WeatherProvider(), home_status, event_list_provider=DummyProvider(),
+                                   notes_provider=DummyProvider(), cache=LastGoodCache())
+    providers.cache.put("home_status.get_status", "LivingRoom: 21.4°C, 48%")
+    assert providers.home_status_provider.get_status() == "LivingRoom: 21.4°C, 48%"
+    assert home_status.rejected == 1 and not home_status.has_data()
+    assert providers.stale()["home_status"] > 0
+    assert providers.cache.get("home_status.get_status")[0] == "LivingRoom: 21.4°C, 48%"
+
+
+def test_weather_state_is_cached_whole():
+    from dashboard_providers import DashboardProviders, DummyProvider
+    from providers import weather_provider
+    from providers.home_status_provider import HomeStatusProvider
+    from providers.weather_state import WeatherState
+    from resilience import LastGoodCache
+    from test_mqtt_providers import deliver
+
+    def dashboard(weather, cache):
+        return DashboardProviders(weather, HomeStatusProvider(), event_list_provider=DummyProvider(),
+                                  notes_provider=DummyProvider(), cache=cache)
+
+    weather = weather_provider.WeatherProvider()
+    deliver(weather, weather_provider.CURRENT_WEATHER_TOPIC, '{"temperature":3.0,"weathercode":71}')
+    deliver(weather, weather_provider.WEATHER_FORECAST_TOPIC,
+            '{"temperature_2m_max":[20,19],"temperature_2m_min":[9,11],"weathercode":[61,3]}')
+    cache = LastGoodCache()
+    state = dashboard(weather, cache).weather_provider.get_weather_state()
+    assert state == WeatherState(3.0, 71, (20, 19), (9, 11), (61, 3))
+
+    # after a restart, before the broker answers, the whole state comes back from the cache
+    restored = dashboard(weather_provider.WeatherProvider(), cache).weather_provider.get_weather_state()
+    assert restored == state and restored.icon() == "❄️" and restored.temperature_text() == "3.0°C"
+    assert dashboard(weather_provider.WeatherProvider(), LastGoodCache()).weather_provider \
+        .get_weather_state().temperature_text() == "N/A°C"
+
+
+def test_frame_budget_is_lifted_after_the_frame(qapp, tmp_path):
+    import render_app
+    from frame_clock import FrameClock
+    from frame_encoder import FrameWriter
+
+    providers = recorded_providers()
+    writer = FrameWriter()
+    try:
+        render_app.render_frame(providers, FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW), writer,
+                                outputs=render_app.get_outputs(str(tmp_path / "frame.png"))).result()
+    finally:
+        writer.close()
+    # calls between frames, like the scheduled events refresh, get their full timeout
+    assert providers.event_list_provider.budget is None
+    assert providers.event_list_provider._timeout() == providers.event_list_provider.timeout
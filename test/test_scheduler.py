@@ -0,0 +1,125 @@
+"""
+Wall-clock aligned rendering (src/scheduler.py) with a fake clock, and the
+frames a long-running process renders.
+"""
+from test_golden import FROZEN_NOW, recorded_providers
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_scheduler(clock, durations, **kwargs):
+    """A scheduler whose frames take the given durations, in order; records the deadlines and start times."""
+    from scheduler import RenderScheduler
+
+    rendered = []
+    durations = iter(durations)
+    def render(deadline):
+        rendered.append((deadline, clock.now))
+        clock.now += next(durations)
+    scheduler = RenderScheduler(render, period=60, safety_margin=0.5, initial_estimate=3.0, alpha=0.5,
+                                time_fn=clock.time, sleep_fn=clock.sleep, **kwargs)
+    return scheduler, rendered
+
+
+def test_frames_start_ahead_of_the_boundary_by_the_estimate():
+    clock = FakeClock(1000.0)
+    scheduler, rendered = make_scheduler(clock, [2.0, 2.0])
+
+    assert scheduler.run_once() == 1020
+    assert rendered == [(1020, 1016.5)] # 3 s estimate + 0.5 s margin before the boundary
+    assert scheduler.estimate.value == 2.5
+
+    assert scheduler.run_once() == 1080
+    assert rendered[1] == (1080, 1077.0)
+    assert (scheduler.frames_rendered, scheduler.frames_skipped, scheduler.deadlines_missed) == (2, 0, 0)
+
+
+def test_unreachable_boundaries_are_skipped():
+    clock = FakeClock(1018.0) # 2 s left, the estimate is 3 s
+    scheduler, rendered = make_scheduler(clock, [3.0])
+
+    assert scheduler.next_deadline(clock.now) == 1080
+    scheduler.run_once()
+    assert rendered == [(1080, 1076.5)]
+
+
+def test_overrun_is_counted_late_and_the_next_frame_skips_ahead():
+    clock = FakeClock(1100.0)
+    scheduler, rendered = make_scheduler(clock, [70.0, 2.0])
+
+    assert scheduler.run_once() == 1140
+    assert scheduler.deadlines_missed == 1
+    # the stall is clipped to twice the estimate, so later frames don't start a minute early
+    assert scheduler.estimate.value == 4.5
+
+    assert scheduler.run_once() == 1260 # 1200 was passed while rendering
+    assert scheduler.frames_skipped == 1
+    assert rendered[1] == (1260, 1255.0)
+
+
+def test_periodic_tasks_keep_their_cadence():
+    from scheduler import PeriodicTask
+
+    calls = []
+    def refresh():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            raise RuntimeError("network down")
+    task = PeriodicTask("events", 900, refresh, next_due=1000)
+
+    assert not task.run_if_due(999)
+    assert task.run_if_due(1010) and task.next_due == 1900 # from the slot, not the late run
+    assert task.run_if_due(1950) and task.next_due == 2800 # a failure still advances the slot
+    assert task.run_if_due(5000) and task.next_due == 5900 # a long gap doesn't replay missed slots
+    assert calls == [0, 1, 2]
+
+
+def test_scheduler_runs_periodic_tasks_after_frames():
+    clock = FakeClock(1000.0)
+    scheduler, rendered = make_scheduler(clock, [2.0] * 3)
+    runs = []
+    scheduler.add_periodic("events", 100, lambda: runs.append(clock.now), run_first=True)
+
+    scheduler.run(max_frames=3)
+    assert [deadline for deadline, _ in rendered] == [1020, 1080, 1140]
+    assert runs == [1018.5, 1139.25] # right after a frame, at most once per interval
+
+
+def test_frame_past_its_deadline_is_not_written(qapp, tmp_path):
+    import render_app
+    from frame_clock import FrameClock
+    from frame_encoder import FrameWriter
+
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    writer = FrameWriter()
+    try:
+        outputs = render_app.get_outputs(str(tmp_path / "frame.png"))
+        assert render_app.render_frame(recorded_providers(), clock, writer, outputs=outputs,
+                                       deadline=0).result() is False
+    finally:
+        writer.close()
+    assert not (tmp_path / "frame.png").exists()
+
+
+def test_widget_frames_release_their_widgets(qapp):
+    import render_app
+    from PySide6.QtWidgets import QApplication
+    from frame_clock import FrameClock
+
+    providers = recorded_providers()
+    clock = FrameClock(render_app.TIMEZONE_STR, FROZEN_NOW)
+    render_app.render_image(providers, clock, "widgets")
+    before = len(QApplication.allWidgets())
+    for _ in range(10):
+        render_app.render_image(providers, clock, "widgets")
+    assert len(QApplication.allWidgets()) == before
+    assert not QApplication.topLevelWidgets()
@@ -0,0 +1,90 @@
+"""
+Config-declared MQTT sensors: ring buffers, payload parsing and painting.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+
+def deliver(provider, topic, payload):
+    provider._on_message(None, None, SimpleNamespace(topic=topic, payload=payload.encode()))
+
+
+def test_buffer_keeps_the_newest_samples_in_order():
+    from providers.sensor_provider import SensorBuffer
+
+    buffer = SensorBuffer(4)
+    for t in range(10):
+        buffer.append(t, t * 10.0)
+
+    assert len(buffer) == 4
+    assert list(buffer.times()) == [6, 7, 8, 9]
+    assert list(buffer.values()) == [60, 70, 80, 90]
+    assert buffer.last() == (9, 90)
+
+
+def test_buffer_downsamples_within_min_interval():
+    from providers.sensor_provider import SensorBuffer
+
+    buffer = SensorBuffer(10, min_interval=60)
+    for t, v in ((0, 1), (10, 2), (59, 3), (60, 4), (130, 5)):
+        buffer.append(t, v)
+
+    assert list(buffer.values()) == [3, 4, 5]
+
+
+@pytest.mark.parametrize("values,expected", [
+    ((20.0, 20.5, 21.0), 1),
+    ((21.0, 20.5, 20.0), -1),
+    ((20.0, 20.05, 20.1), 0),
+])
+def test_buffer_trend(values, expected):
+    from providers.sensor_provider import SensorBuffer
+
+    buffer = SensorBuffer(10)
+    for t, v in enumerate(values):
+        buffer.append(t, v)
+    assert buffer.trend(window=60, threshold=0.2) == expected
+
+
+def test_provider_samples_configured_topics():
+    from providers.sensor_provider import SensorProvider
+
+    clock = iter(range(100))
+    provider = SensorProvider([
+        {"name": "Temp", "topic": "home/climate", "value_key": "temperature", "unit": "°C", "format": "{name} {value:.1f}{unit}"},
+        {"name": "Hum", "topic": "home/climate", "value_key": "humidity", "unit": "%", "history": 2},
+        {"name": "Power", "topic": "home/power"},
+    ], time_fn=lambda: next(clock))
+
+    for temperature, humidity in ((20.1, 40), (20.6, 45), (21.2, 50)):
+        deliver(provider, "home/climate", f'{{"temperature": {temperature}, "humidity": {humidity}}}')
+    deliver(provider, "home/power", "unavailable")
+    deliver(provider, "home/other", "1")
+
+    temp, hum, power = provider.get_readings()
+    assert temp.text() == "Temp 21.2°C"
+    assert (temp.minimum, temp.maximum, temp.trend) == (20.1, 21.2, 1)
+    assert hum.values == (45, 50)
+    assert power.value is None and power.text() == "Power N/A"
+    assert (provider.received, provider.rejected) == (3, 1)
+
+
+def test_paint_sensor_draws_value_and_sparkline(qapp):
+    from PySide6.QtCore import QRectF
+    from PySide6.QtGui import QColor, QImage, QPainter
+    from painter_backend import paint_sensor
+    from providers.sensor_provider import SensorReading
+
+    reading = SensorReading("Temp", "°C", 21.0, 0.0, 18.0, 21.0, 1, (18.0, 19.5, 21.0),
+                            {"show": ["value", "trend", "minmax", "sparkline"]})
+    image = QImage(200, 60, QImage.Format_RGB32)
+    image.fill(QColor("white"))
+    painter = QPainter(image)
+    paint_sensor(painter, QRectF(0, 0, 200, 60), reading, "black")
+    painter.end()
+
+    def dark_rows(top, bottom):
+        return sum(1 for y in range(top, bottom) if any(QColor(image.pixel(x, y)).lightness() < 128 for x in range(200)))
+    assert dark_rows(0, 15) > 0   # value line
+    assert dark_rows(25, 60) > 0  # sparkline
@@ -0,0 +1,76 @@
+"""
+The providers against the local MQTT broker and Calendar API stand-ins.
+"""
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from standins.calendar_api import FakeCalendarApi, synthetic_calendars
+from standins.mqtt_broker import LocalMqttBroker, topic_matches
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.mark.parametrize("topic_filter,topic,expected", [
+    ("weather/current", "weather/current", True),
+    ("weather/+", "weather/current", True),
+    ("weather/#", "weather/a/b", True),
+    ("weather/+", "weather/a/b", False),
+    ("weather/current", "weather/estimation", False),
+])
+def test_topic_matches(topic_filter, topic, expected):
+    assert topic_matches(topic_filter, topic) is expected
+
+
+def test_events_provider_pages_through_calendar_api(monkeypatch):
+    from providers import events_provider
+
+    now = datetime(2025, 5, 19, 8, 30, tzinfo=timezone.utc)
+    calendars = synthetic_calendars(3, 7, month=now.date())
+    api = FakeCalendarApi(calendars, page_size=2).start()
+    try:
+        monkeypatch.setattr(events_provider, "API_ENDPOINT", api.endpoint)
+        provider = events_provider.EventsProvider("Europe/Amsterdam")
+        events = provider.refresh(now)
+    finally:
+        api.stop()
+
+    expected = {e["id"] for c in calendars.values() for e in c["events"]
+                if e["start"].get("dateTime", e["start"].get("date")) >= "2025-05"}
+    assert {e["id"] for e in events} == expected
+    # 2 calendarList pages + 4 events pages per calendar
+    assert api.requests == 2 + 3 * 4
+
+
+def test_weather_provider_receives_from_broker(monkeypatch):
+    from providers import weather_provider
+
+    with open(os.path.join(HERE, "fixtures", "weather_messages.json")) as f:
+        messages = json.load(f)
+
+    broker = LocalMqttBroker().start()
+    monkeypatch.setattr(weather_provider, "BROKER", "127.0.0.1")
+    monkeypatch.setattr(weather_provider, "PORT", broker.port)
+    provider = weather_provider.WeatherProvider()
+    provider.start()
+    try:
+        assert broker.wait_for_subscription()
+        # retained, since the provider subscribes to its topics one at a time
+        broker.replay(messages, retain=True)
+        assert wait_until(lambda: provider.get_highs_and_lows()[0][0] == 20.4)
+        assert provider.get_current_temperature() == "15.6°C"
+    finally:
+        provider.stop()
+        broker.stop()
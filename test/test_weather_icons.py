@@ -0,0 +1,78 @@
+"""
+WMO code table (src/providers/weather_codes.py) and the 1-bit icon atlas
+(src/weather_icons.py).
+"""
+from test_mqtt_providers import deliver
+
+
+def test_codes_map_to_conditions():
+    from providers.weather_codes import CONDITIONS, EMOJI, UNKNOWN, condition, conditions
+
+    assert [condition(c) for c in (0, 1, 2, 3, 48, 56, 65, 77, 81, 86, 99)] == [
+        "clear", "mostly_clear", "partly_cloudy", "overcast", "fog", "drizzle", "rain", "snow", "showers",
+        "snow_showers", "thunderstorm"]
+    assert condition(None) == condition(-1) == condition(4) == condition(100) == UNKNOWN
+    assert conditions([2, 3, 53, 999]) == ("partly_cloudy", "overcast", "drizzle", UNKNOWN)
+    assert set(EMOJI) == set(CONDITIONS)
+
+
+def test_forecast_codes_are_parsed_and_validated():
+    from providers import weather_provider
+
+    provider = weather_provider.WeatherProvider()
+    deliver(provider, weather_provider.WEATHER_FORECAST_TOPIC,
+            '{"temperature_2m_max":[20,19],"temperature_2m_min":[9,11],"weathercode":[61,3]}')
+    assert provider.get_daily_codes() == (61, 3)
+
+    # codes that don't line up with the days are rejected with the rest of the forecast
+    deliver(provider, weather_provider.WEATHER_FORECAST_TOPIC,
+            '{"temperature_2m_max":[1,2],"temperature_2m_min":[1,2],"weathercode":[0]}')
+    assert provider.get_daily_codes() == (61, 3) and provider.rejected == 1
+
+    deliver(provider, weather_provider.CURRENT_WEATHER_TOPIC, '{"temperature":3.0,"weathercode":71}')
+    assert provider.get_weather_code() == 71 and provider.get_weather_icon() == "❄️"
+
+
+def test_atlas_is_one_bit_and_cached_on_disk(qapp, tmp_path):
+    from PySide6.QtCore import QRectF
+    from PySide6.QtGui import QImage, QPainter
+    from providers.weather_codes import CONDITIONS
+    from weather_icons import IconAtlas
+
+    atlas = IconAtlas(str(tmp_path))
+    sheet = atlas.sheet(32)
+    assert (sheet.width(), sheet.height()) == (32 * len(CONDITIONS), 32)
+    assert sheet.format() == QImage.Format_Mono
+    assert atlas.rendered == 1 and len(list(tmp_path.iterdir())) == 1
+
+    # a second process loads the sheet instead of drawing it again
+    other = IconAtlas(str(tmp_path))
+    assert other.sheet(32) == sheet and other.rendered == 0
+
+    image = QImage(64, 64, QImage.Format_ARGB32)
+    image.fill(0xffffffff)
+    painter = QPainter(image)
+    painter.scale(2, 2) # the 32 px cell is blitted 1:1 on a 2x output
+    other.draw(painter, QRectF(0, 0, 32, 32), 95, "black")
+    painter.end()
+    colors = {image.pixel(x, y) for x in range(64) for y in range(64)}
+    assert colors == {0xffffffff, 0xff000000}
+    assert other.rendered == 1 # 64 px sheet, not in the cache yet
+
+
+def test_unknown_icon_before_the_first_message():
+    from providers import weather_provider
+
+    provider = weather_provider.WeatherProvider()
+    assert provider.get_weather_code() is None
+    assert provider.get_weather_icon() == "?"
+
+
+def test_layouts_without_icon_geometry_keep_the_emoji():
+    from painter_backend import weather_icon_uses_atlas
+
+    legacy = {"font_size": 90, "geometry": [5, -50, 175, 160]}
+    assert not weather_icon_uses_atlas(legacy)
+    assert weather_icon_uses_atlas(dict(legacy, icon_geometry=[20, 10, 150, 150]))
+    assert not weather_icon_uses_atlas(dict(legacy, icon_geometry=[20, 10, 150, 150], style="emoji"))
+    assert weather_icon_uses_atlas(dict(legacy, style="atlas"))